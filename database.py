@@ -6,26 +6,114 @@ Implements the database schema as specified in the POC requirements.
 """
 
 import sqlite3
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Iterator
 import logging
+import os
 
-# Database file path constant
-DATABASE_PATH = "./tasks.db"
+# Database file path or SQLite URI; MCP_DB_URL overrides the default file
+DATABASE_PATH = os.environ.get("MCP_DB_URL", "./tasks.db")
+
+# Stored in PRAGMA user_version once init_database() has built the schema;
+# bump it whenever init_database() gains a new schema step
+SCHEMA_VERSION = 1
+
+# Database paths whose journal mode is WAL, as found by init_database()
+_wal_databases = set()
+
+# Columns returned for a work item, in table order
+WORK_ITEM_COLUMNS = (
+    'id', 'project_id', 'type', 'title', 'description', 'status', 'parent_id',
+    'notes', 'order_index', 'created_at', 'updated_at'
+)
+_WORK_ITEM_SELECT_LIST = ', '.join(WORK_ITEM_COLUMNS)
+
+# Denormalized direct-child counters, kept current by triggers and read by
+# get_completion_stats(); not part of the work item returned to callers
+CHILD_COUNT_COLUMNS = ('total_children', 'completed_children')
+
+# Valid parent types for each item type (None means top-level)
+HIERARCHY_RULES = {
+    'project': [None],  # Projects can only be top-level (no parent)
+    'phase': ['project'],  # Phases can only be under projects
+    'task': ['project', 'phase'],  # Tasks can be under projects or phases
+    'subtask': ['task']  # Subtasks can only be under tasks
+}
+
+# Precomputed lookups so validation is a single set membership test
+_VALID_PARENT_CHILD = frozenset(
+    (parent_type, item_type)
+    for item_type, parent_types in HIERARCHY_RULES.items()
+    for parent_type in parent_types
+    if parent_type is not None
+)
+_TOP_LEVEL_ALLOWED = frozenset(
+    item_type for item_type, parent_types in HIERARCHY_RULES.items() if None in parent_types
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 
+class HierarchyError(ValueError):
+    """Base class for work item hierarchy validation failures."""
+
+
+class InvalidHierarchyError(HierarchyError):
+    """An item type is not allowed under the given parent type."""
+    
+    def __init__(self, message: str, item_type: str, parent_type: str):
+        super().__init__(message)
+        self.item_type = item_type
+        self.parent_type = parent_type
+
+
+class OrphanNotAllowedError(HierarchyError):
+    """An item type that requires a parent was placed at the top level."""
+    
+    def __init__(self, message: str, item_type: str):
+        super().__init__(message)
+        self.item_type = item_type
+
+
+class CrossProjectParentError(HierarchyError):
+    """The parent item belongs to a different project."""
+    
+    def __init__(self, message: str, project_id: str, parent_project_id: str):
+        super().__init__(message)
+        self.project_id = project_id
+        self.parent_project_id = parent_project_id
+
+
+class ParentNotFoundError(HierarchyError):
+    """The referenced parent item does not exist (in this project)."""
+    
+    def __init__(self, message: str, parent_id: int):
+        super().__init__(message)
+        self.parent_id = parent_id
+
+
+class CircularReferenceError(HierarchyError):
+    """The change would make an item its own ancestor."""
+
+
 def get_connection() -> sqlite3.Connection:
     """
     Get a connection to the SQLite database.
     
+    DATABASE_PATH may be a plain file path or a SQLite URI
+    (e.g. "file:tasks?mode=memory&cache=shared").
+    
     Returns:
         sqlite3.Connection: Database connection with row factory set
     """
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = sqlite3.connect(DATABASE_PATH, uri=True)
     conn.row_factory = sqlite3.Row  # Enable column access by name
+    if DATABASE_PATH in _wal_databases:
+        # Durable at checkpoint rather than every commit; only safe under WAL
+        conn.execute("PRAGMA synchronous=NORMAL")
     return conn
 
 
@@ -74,14 +162,36 @@ def check_database_health() -> Dict[str, Any]:
         }
 
 
-def init_database() -> None:
+def init_database(database_path: Optional[str] = None) -> None:
     """
     Initialize the database with required tables and indexes.
-    This function is idempotent and safe to run multiple times.
+    This function is idempotent and safe to run multiple times; once a
+    database is stamped with the current SCHEMA_VERSION, the schema
+    statements are skipped.
+    
+    Args:
+        database_path: If given, point the module at this file path or SQLite URI
+            (e.g. "file:tasks?mode=memory&cache=shared") before initializing
     """
-    logger.info("Initializing database...")
+    global DATABASE_PATH
+    if database_path is not None:
+        DATABASE_PATH = database_path
     
     with get_connection() as conn:
+        # Write-ahead logging persists in the file; in-memory databases ignore it
+        journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode == 'wal':
+            _wal_databases.add(DATABASE_PATH)
+        else:
+            _wal_databases.discard(DATABASE_PATH)
+        
+        # A database that already has the current schema needs nothing more;
+        # a new, deleted or recreated one reads 0 here
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        
+        logger.info("Initializing database...")
+        
         # Create work_items table
         conn.execute('''
             CREATE TABLE IF NOT EXISTS work_items (
@@ -96,10 +206,70 @@ def init_database() -> None:
                 notes TEXT,
                 order_index REAL DEFAULT 1.0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                total_children INTEGER NOT NULL DEFAULT 0,
+                completed_children INTEGER NOT NULL DEFAULT 0
             )
         ''')
         
+        # Add the child counters to databases created before they existed
+        existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(work_items)")}
+        missing_columns = [column for column in CHILD_COUNT_COLUMNS if column not in existing_columns]
+        for column in missing_columns:
+            conn.execute(f"ALTER TABLE work_items ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        if missing_columns:
+            conn.execute('''
+                UPDATE work_items SET
+                    total_children = (
+                        SELECT COUNT(*) FROM work_items AS child
+                        WHERE child.parent_id = work_items.id
+                    ),
+                    completed_children = (
+                        SELECT COUNT(*) FROM work_items AS child
+                        WHERE child.parent_id = work_items.id AND child.status = 'completed'
+                    )
+            ''')
+        
+        # Keep the parent's child counters in step with every insert, delete,
+        # status change and move, whichever code path makes it
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_work_items_count_insert
+            AFTER INSERT ON work_items
+            WHEN NEW.parent_id IS NOT NULL
+            BEGIN
+                UPDATE work_items SET
+                    total_children = total_children + 1,
+                    completed_children = completed_children + (NEW.status = 'completed')
+                WHERE id = NEW.parent_id;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_work_items_count_delete
+            AFTER DELETE ON work_items
+            WHEN OLD.parent_id IS NOT NULL
+            BEGIN
+                UPDATE work_items SET
+                    total_children = total_children - 1,
+                    completed_children = completed_children - (OLD.status = 'completed')
+                WHERE id = OLD.parent_id;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_work_items_count_update
+            AFTER UPDATE OF status, parent_id ON work_items
+            WHEN OLD.status IS NOT NEW.status OR OLD.parent_id IS NOT NEW.parent_id
+            BEGIN
+                UPDATE work_items SET
+                    total_children = total_children - 1,
+                    completed_children = completed_children - (OLD.status = 'completed')
+                WHERE id = OLD.parent_id;
+                UPDATE work_items SET
+                    total_children = total_children + 1,
+                    completed_children = completed_children + (NEW.status = 'completed')
+                WHERE id = NEW.parent_id;
+            END
+        ''')
+        
         # Create changelog table
         conn.execute('''
             CREATE TABLE IF NOT EXISTS changelog (
@@ -116,11 +286,47 @@ def init_database() -> None:
         conn.execute('CREATE INDEX IF NOT EXISTS idx_project ON work_items(project_id)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_parent ON work_items(parent_id)')
         conn.execute('CREATE INDEX IF NOT EXISTS idx_status ON work_items(status)')
+        # Serves per-project reads ordered by parent, as consumed by build_hierarchy
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_work_items_proj_parent
+            ON work_items(project_id, parent_id, order_index)
+        ''')
+        # Partial index over incomplete items only, for the rolling work plan query
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_wi_incomplete
+            ON work_items(project_id, parent_id, order_index)
+            WHERE status != 'completed'
+        ''')
         
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         conn.commit()
         logger.info("Database initialization complete")
 
 
+@contextmanager
+def temporary_database(database_path: str) -> Iterator[None]:
+    """
+    Point the module at another database for the duration of a with statement.
+    
+    The database is initialized on entry and one connection is held open
+    throughout, so a shared-cache in-memory URI
+    (e.g. "file:scratch?mode=memory&cache=shared") outlives the module's
+    per-call connections. The previous DATABASE_PATH is restored on exit.
+    
+    Args:
+        database_path: File path or SQLite URI to use inside the block
+    """
+    global DATABASE_PATH
+    previous_path = DATABASE_PATH
+    keeper = sqlite3.connect(database_path, uri=True)
+    try:
+        init_database(database_path)
+        yield
+    finally:
+        DATABASE_PATH = previous_path
+        keeper.close()
+
+
 def get_work_items_for_project(project_id: str, status_filter: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """
     Get all work items for a project, optionally filtered by status.
@@ -133,28 +339,24 @@ def get_work_items_for_project(project_id: str, status_filter: Optional[List[str
         List of work items as dictionaries
     """
     if status_filter is None:
-        status_filter = ['not_started', 'in_progress']
+        # Literal predicate (not bound parameters) so SQLite can use the
+        # idx_wi_incomplete partial index
+        status_clause = "status != 'completed'"
+        params = [project_id]
+    else:
+        placeholders = ','.join('?' for _ in status_filter)
+        status_clause = f"status IN ({placeholders})"
+        params = [project_id] + status_filter
     
     with get_connection() as conn:
         # Build query with status filter
-        placeholders = ','.join('?' for _ in status_filter)
         query = f"""
-            SELECT id, project_id, type, title, description, status, parent_id, 
-                   notes, order_index, created_at, updated_at
+            SELECT {_WORK_ITEM_SELECT_LIST}
             FROM work_items 
-            WHERE project_id = ? AND status IN ({placeholders})
-            ORDER BY 
-                CASE type 
-                    WHEN 'project' THEN 1 
-                    WHEN 'phase' THEN 2 
-                    WHEN 'task' THEN 3 
-                    WHEN 'subtask' THEN 4 
-                END,
-                order_index ASC,
-                created_at ASC
+            WHERE project_id = ? AND {status_clause}
+            ORDER BY parent_id, order_index ASC, created_at ASC
         """
         
-        params = [project_id] + status_filter
         cursor = conn.execute(query, params)
         
         # Convert rows to dictionaries
@@ -178,20 +380,11 @@ def get_all_work_items_for_project(project_id: str) -> List[Dict[str, Any]]:
         List of all work items as dictionaries
     """
     with get_connection() as conn:
-        query = """
-            SELECT id, project_id, type, title, description, status, parent_id, 
-                   notes, order_index, created_at, updated_at
+        query = f"""
+            SELECT {_WORK_ITEM_SELECT_LIST}
             FROM work_items 
             WHERE project_id = ?
-            ORDER BY 
-                CASE type 
-                    WHEN 'project' THEN 1 
-                    WHEN 'phase' THEN 2 
-                    WHEN 'task' THEN 3 
-                    WHEN 'subtask' THEN 4 
-                END,
-                order_index ASC,
-                created_at ASC
+            ORDER BY parent_id, order_index ASC, created_at ASC
         """
         
         cursor = conn.execute(query, [project_id])
@@ -205,6 +398,85 @@ def get_all_work_items_for_project(project_id: str) -> List[Dict[str, Any]]:
         return items
 
 
+def get_work_items_page(project_id: str, after_id: int = 0,
+                        limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Get one page of a project's incomplete work items, in ID order.
+    
+    Pages are keyed on the last ID seen rather than an OFFSET, so each page
+    is an index seek no matter how far into the project it starts.
+    
+    Args:
+        project_id: Project identifier
+        after_id: Return items with IDs greater than this (0 for the first page)
+        limit: Maximum number of items in the page
+    
+    Returns:
+        Tuple of (items, cursor); pass cursor as after_id to get the next
+        page. cursor is None once the last page has been returned.
+    
+    Raises:
+        ValueError: If limit is less than 1
+    """
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    
+    with get_connection() as conn:
+        cursor = conn.execute(f"""
+            SELECT {_WORK_ITEM_SELECT_LIST}
+            FROM work_items
+            WHERE project_id = ? AND id > ? AND status != 'completed'
+            ORDER BY id
+            LIMIT ?
+        """, [project_id, after_id, limit])
+        items = [dict(row) for row in cursor.fetchall()]
+    
+    next_cursor = items[-1]['id'] if len(items) == limit else None
+    return items, next_cursor
+
+
+def iter_work_items_paged(project_id: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+    """
+    Yield a project's incomplete work items in ID order, one page at a time.
+    
+    Only page_size rows are held in memory at once; see get_work_items_page().
+    
+    Args:
+        project_id: Project identifier
+        page_size: Number of items fetched per query
+    
+    Yields:
+        Work items as dictionaries
+    """
+    after_id = 0
+    while after_id is not None:
+        items, after_id = get_work_items_page(project_id, after_id, page_size)
+        yield from items
+
+
+def get_completion_stats(project_id: str) -> Dict[Optional[int], Tuple[int, int]]:
+    """
+    Get completed vs total child counts for every parent in a project.
+    
+    The counts are read from each parent's denormalized child counters, so
+    this touches one row per parent instead of counting every child.
+    
+    Args:
+        project_id: Project identifier
+    
+    Returns:
+        Dict mapping parent ID to a (completed, total) tuple
+    """
+    with get_connection() as conn:
+        cursor = conn.execute("""
+            SELECT id, completed_children, total_children
+            FROM work_items
+            WHERE project_id = ? AND total_children > 0
+        """, [project_id])
+        
+        return {row['id']: (row['completed_children'], row['total_children']) for row in cursor.fetchall()}
+
+
 def build_hierarchy(items: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Build nested hierarchy structure from flat list of work items.
@@ -216,14 +488,48 @@ def build_hierarchy(items: List[Dict[str, Any]]) -> Dict[str, Any]:
         Dict with nested structure: projects -> phases -> tasks -> subtasks
         Also includes orphaned items that don't fit the hierarchy
     """
-    # Organize items by parent_id
-    by_parent = {}  # parent_id -> [children]
+    return _build_hierarchy(items)
+
+
+def build_hierarchy_with_summaries(items: List[Dict[str, Any]],
+                                   all_items: Optional[List[Dict[str, Any]]] = None,
+                                   completion_stats: Optional[Dict[Optional[int], Tuple[int, int]]] = None) -> Dict[str, Any]:
+    """
+    Build the hierarchy and attach completion summaries in a single traversal.
+    
+    Equivalent to add_completion_summaries(build_hierarchy(items), ...),
+    but each phase and task gets its summary as it is built.
+    
+    Args:
+        items: Flat list of work items to show (usually incomplete items only)
+        all_items: All work items for the project (including completed ones)
+        completion_stats: Precomputed counts from get_completion_stats(), used
+            instead of all_items when given
+    
+    Returns:
+        Hierarchy structure with completion summaries added
+    """
+    return _build_hierarchy(items, _completion_counts_if_any(all_items, completion_stats))
+
+
+def _build_hierarchy(items: List[Dict[str, Any]],
+                     completion_counts: Optional[Dict[Optional[int], Tuple[int, int]]] = None) -> Dict[str, Any]:
+    """
+    Build the nested hierarchy, optionally adding completion summaries.
+    
+    Args:
+        items: Flat list of work items with parent_id relationships
+        completion_counts: Completed/total child counts by parent ID, from
+            _count_completed_children(); summaries are skipped if None
+    
+    Returns:
+        Dict with nested structure: projects -> phases -> tasks -> subtasks
+    """
+    # Organize items by parent_id in a single pass
+    by_parent = defaultdict(list)  # parent_id -> [children]
     
     for item in items:
-        parent_id = item['parent_id']
-        if parent_id not in by_parent:
-            by_parent[parent_id] = []
-        by_parent[parent_id].append(item)
+        by_parent[item['parent_id']].append(item)
     
     # Build hierarchy starting from projects (no parent)
     hierarchy = {
@@ -263,39 +569,17 @@ def build_hierarchy(items: List[Dict[str, Any]]) -> Dict[str, Any]:
             
             # Process tasks under phase
             for task in tasks:
-                task_dict = dict(task)
-                task_dict['subtasks'] = []
-                processed_ids.add(task['id'])
-                
-                # Get subtasks under this task
-                task_children = by_parent.get(task['id'], [])
-                subtasks = [item for item in task_children if item['type'] == 'subtask']
-                
-                # Process subtasks
-                for subtask in subtasks:
-                    processed_ids.add(subtask['id'])
-                
-                task_dict['subtasks'] = subtasks
-                phase_dict['tasks'].append(task_dict)
+                phase_dict['tasks'].append(
+                    _build_task_node(task, by_parent, processed_ids, completion_counts))
             
+            if completion_counts is not None:
+                _set_completion_summary(phase_dict, completion_counts, 'tasks')
             project_dict['phases'].append(phase_dict)
         
         # Process direct tasks (tasks directly under project)
         for task in direct_tasks:
-            task_dict = dict(task)
-            task_dict['subtasks'] = []
-            processed_ids.add(task['id'])
-            
-            # Get subtasks under this task
-            task_children = by_parent.get(task['id'], [])
-            subtasks = [item for item in task_children if item['type'] == 'subtask']
-            
-            # Process subtasks
-            for subtask in subtasks:
-                processed_ids.add(subtask['id'])
-            
-            task_dict['subtasks'] = subtasks
-            project_dict['direct_tasks'].append(task_dict)
+            project_dict['direct_tasks'].append(
+                _build_task_node(task, by_parent, processed_ids, completion_counts))
         
         hierarchy['projects'].append(project_dict)
     
@@ -308,86 +592,133 @@ def build_hierarchy(items: List[Dict[str, Any]]) -> Dict[str, Any]:
     return hierarchy
 
 
-def add_completion_summaries(hierarchy: Dict[str, Any], all_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+def _build_task_node(task: Dict[str, Any],
+                     by_parent: Dict[Optional[int], List[Dict[str, Any]]],
+                     processed_ids: set,
+                     completion_counts: Optional[Dict[Optional[int], Tuple[int, int]]]) -> Dict[str, Any]:
+    """
+    Build a task node with its subtasks, shared by phase and direct tasks.
+    
+    Args:
+        task: The task work item
+        by_parent: Work items grouped by parent ID
+        processed_ids: IDs placed in the hierarchy so far; updated in place
+        completion_counts: Completed/total child counts by parent ID, or None
+    
+    Returns:
+        Copy of the task with its 'subtasks' list (and summary, if counted)
+    """
+    task_dict = dict(task)
+    processed_ids.add(task['id'])
+    
+    # Get subtasks under this task
+    task_children = by_parent.get(task['id'], [])
+    subtasks = [item for item in task_children if item['type'] == 'subtask']
+    
+    # Process subtasks
+    for subtask in subtasks:
+        processed_ids.add(subtask['id'])
+    
+    task_dict['subtasks'] = subtasks
+    if completion_counts is not None:
+        _set_completion_summary(task_dict, completion_counts, 'subtasks')
+    return task_dict
+
+
+def add_completion_summaries(hierarchy: Dict[str, Any], all_items: Optional[List[Dict[str, Any]]] = None,
+                             completion_stats: Optional[Dict[Optional[int], Tuple[int, int]]] = None) -> Dict[str, Any]:
     """
     Add completion summaries for sections where all children are completed.
     
     Args:
         hierarchy: Hierarchy structure from build_hierarchy()
         all_items: All work items for the project (including completed ones)
+        completion_stats: Precomputed counts from get_completion_stats(), used
+            instead of all_items when given
     
     Returns:
         Modified hierarchy with completion summaries added
     """
-    # Create lookup for all items by ID
-    items_by_id = {item['id']: item for item in all_items}
-    
-    def check_all_children_completed(parent_id: int, item_type: str) -> bool:
-        """Check if all children of a parent are completed"""
-        children = [item for item in all_items 
-                   if item.get('parent_id') == parent_id]
-        
-        if not children:
-            return False
-            
-        return all(child['status'] == 'completed' for child in children)
-    
-    def count_completed_children(parent_id: int) -> tuple:
-        """Count completed vs total children"""
-        children = [item for item in all_items 
-                   if item.get('parent_id') == parent_id]
-        
-        if not children:
-            return 0, 0
-            
-        completed = sum(1 for child in children if child['status'] == 'completed')
-        return completed, len(children)
+    completion_stats = _completion_counts_if_any(all_items, completion_stats)
+    if completion_stats is None:
+        return hierarchy  # Nothing completed yet, so there is nothing to summarize
     
     # Process each project in the hierarchy
     for project in hierarchy['projects']:
-        project_id = project['id']
-        
         # Check phases for completion summaries
         for phase in project['phases']:
-            phase_id = phase['id']
-            completed_tasks, total_tasks = count_completed_children(phase_id)
-            
-            if completed_tasks > 0 and completed_tasks == total_tasks:
-                # All tasks in this phase are completed
-                phase['completion_summary'] = f"✓ All {total_tasks} tasks completed"
-            elif completed_tasks > 0:
-                # Some tasks completed
-                phase['completion_summary'] = f"✓ {completed_tasks}/{total_tasks} tasks completed"
+            _set_completion_summary(phase, completion_stats, 'tasks')
         
         # Check direct tasks for subtask completion
         for task in project['direct_tasks']:
-            task_id = task['id']
-            completed_subtasks, total_subtasks = count_completed_children(task_id)
-            
-            if completed_subtasks > 0 and completed_subtasks == total_subtasks:
-                # All subtasks completed
-                task['completion_summary'] = f"✓ All {total_subtasks} subtasks completed"
-            elif completed_subtasks > 0:
-                # Some subtasks completed
-                task['completion_summary'] = f"✓ {completed_subtasks}/{total_subtasks} subtasks completed"
+            _set_completion_summary(task, completion_stats, 'subtasks')
         
         # Check tasks within phases for subtask completion
         for phase in project['phases']:
             for task in phase['tasks']:
-                task_id = task['id']
-                completed_subtasks, total_subtasks = count_completed_children(task_id)
-                
-                if completed_subtasks > 0 and completed_subtasks == total_subtasks:
-                    # All subtasks completed
-                    task['completion_summary'] = f"✓ All {total_subtasks} subtasks completed"
-                elif completed_subtasks > 0:
-                    # Some subtasks completed
-                    task['completion_summary'] = f"✓ {completed_subtasks}/{total_subtasks} subtasks completed"
+                _set_completion_summary(task, completion_stats, 'subtasks')
     
     logger.info("Added completion summaries to hierarchy")
     return hierarchy
 
 
+def _completion_counts_if_any(all_items: Optional[List[Dict[str, Any]]],
+                              completion_stats: Optional[Dict[Optional[int], Tuple[int, int]]]
+                              ) -> Optional[Dict[Optional[int], Tuple[int, int]]]:
+    """
+    Get completion counts from precomputed stats or all_items, or None if nothing is completed.
+    
+    The check stops at the first completed item, so a plan where nothing has
+    been completed yet skips counting and the summary traversal entirely.
+    """
+    if completion_stats is not None:
+        return completion_stats if any(completed for completed, _ in completion_stats.values()) else None
+    
+    if not any(item['status'] == 'completed' for item in all_items or ()):
+        return None
+    return _count_completed_children(all_items)
+
+
+def _count_completed_children(all_items: List[Dict[str, Any]]) -> Dict[Optional[int], Tuple[int, int]]:
+    """
+    Count completed vs total children for every parent in a single pass.
+    
+    Args:
+        all_items: All work items for the project (including completed ones)
+    
+    Returns:
+        Dict mapping parent ID to a (completed, total) tuple
+    """
+    counts = {}  # parent_id -> [completed, total]
+    for item in all_items:
+        parent_counts = counts.setdefault(item.get('parent_id'), [0, 0])
+        parent_counts[1] += 1
+        if item['status'] == 'completed':
+            parent_counts[0] += 1
+    
+    return {parent_id: tuple(parent_counts) for parent_id, parent_counts in counts.items()}
+
+
+def _set_completion_summary(node: Dict[str, Any], completion_counts: Dict[Optional[int], Tuple[int, int]],
+                            child_label: str) -> None:
+    """
+    Set a node's completion_summary if any of its children are completed.
+    
+    Args:
+        node: Phase or task node in the hierarchy
+        completion_counts: Completed/total child counts by parent ID
+        child_label: Plural name of the children ('tasks' or 'subtasks')
+    """
+    completed, total = completion_counts.get(node['id'], (0, 0))
+    
+    if completed > 0 and completed == total:
+        # All children completed
+        node['completion_summary'] = f"✓ All {total} {child_label} completed"
+    elif completed > 0:
+        # Some children completed
+        node['completion_summary'] = f"✓ {completed}/{total} {child_label} completed"
+
+
 def create_work_item(project_id: str, item_type: str, title: str, description: str = None, parent_id: Optional[int] = None, notes: str = None) -> Dict[str, Any]:
     """
     Create a new work item in the database with hierarchy validation.
@@ -406,59 +737,201 @@ def create_work_item(project_id: str, item_type: str, title: str, description: s
     Raises:
         ValueError: If hierarchy validation fails
     """
+    with get_connection() as conn:
+        created_item = _create_work_item(conn, project_id, item_type, title, description, parent_id, notes)
+        conn.commit()
+        return created_item
+
+
+def _create_work_item(conn: sqlite3.Connection, project_id: str, item_type: str, title: str,
+                      description: Optional[str], parent_id: Optional[int], notes: Optional[str]) -> Dict[str, Any]:
+    """Create a work item and its changelog entry on an open connection, without committing."""
     # Validate hierarchy rules
-    _validate_hierarchy(project_id, item_type, parent_id)
+    _validate_hierarchy(conn, project_id, item_type, parent_id)
     
-    with get_connection() as conn:
-        # Auto-generate order_index: get max sibling order + 10
-        if parent_id is None:
-            # Top-level item, get max order for items with no parent in this project
-            cursor = conn.execute(
-                "SELECT COALESCE(MAX(order_index), 0) FROM work_items WHERE project_id = ? AND parent_id IS NULL",
-                [project_id]
-            )
-        else:
-            # Child item, get max order for siblings with same parent
-            cursor = conn.execute(
-                "SELECT COALESCE(MAX(order_index), 0) FROM work_items WHERE project_id = ? AND parent_id = ?",
-                [project_id, parent_id]
-            )
-        
-        max_order = cursor.fetchone()[0]
-        new_order = max_order + 10
-        
-        # Insert the new work item
-        cursor = conn.execute('''
-            INSERT INTO work_items (
-                project_id, type, title, description, parent_id, notes, order_index,
-                status, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, 'not_started', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-        ''', [project_id, item_type, title, description, parent_id, notes, new_order])
-        
-        new_id = cursor.lastrowid
-        
-        # Fetch the created item to return complete data
-        cursor = conn.execute('''
-            SELECT id, project_id, type, title, description, status, parent_id,
-                   notes, order_index, created_at, updated_at
-            FROM work_items WHERE id = ?
-        ''', [new_id])
-        
-        created_item = dict(cursor.fetchone())
+    # Auto-generate order_index: get max sibling order + 10
+    new_order = _next_order_index(conn, project_id, parent_id)
+    
+    # Insert the new work item
+    cursor = conn.execute('''
+        INSERT INTO work_items (
+            project_id, type, title, description, parent_id, notes, order_index,
+            status, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, 'not_started', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    ''', [project_id, item_type, title, description, parent_id, notes, new_order])
+    
+    new_id = cursor.lastrowid
+    
+    # Fetch the created item to return complete data
+    cursor = conn.execute(f'''
+        SELECT {_WORK_ITEM_SELECT_LIST}
+        FROM work_items WHERE id = ?
+    ''', [new_id])
+    
+    created_item = dict(cursor.fetchone())
+    logger.info(f"Created work item {new_id}: {item_type} '{title}' in project {project_id}")
+    
+    # Log creation to changelog
+    details = _creation_details(item_type, title, parent_id, description)
+    _log_to_changelog(conn, new_id, project_id, "created", details)
+    
+    return created_item
+
+
+def create_work_items_bulk(project_id: str, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Create many work items in a single transaction.
+    
+    Each spec is a dict with 'type' and 'title' and optional 'description' and
+    'notes'. A parent is given either as 'parent_id' (an existing item) or as
+    'parent' (the 'key' of an earlier spec in the same batch), so a whole tree
+    can be created with one call. The batch is validated before anything is
+    written, then inserted with a single executemany.
+    
+    Args:
+        project_id: Project identifier
+        specs: Work item specifications, parents listed before their children
+    
+    Returns:
+        List of created work items, in the same order as specs
         
+    Raises:
+        ValueError: If a spec references an unknown key or hierarchy validation fails
+    """
+    if not specs:
+        return []
+    
+    with get_connection() as conn:
+        # Take the write lock up front so the ids assigned from MAX(id) stay free
+        conn.execute("BEGIN IMMEDIATE")
+        created_items = _create_work_items_bulk(conn, project_id, specs)
         conn.commit()
-        logger.info(f"Created work item {new_id}: {item_type} '{title}' in project {project_id}")
-        
-        # Log creation to changelog
-        details = f"Created {item_type}: '{title}'"
-        if parent_id:
-            details += f" (parent: {parent_id})"
-        if description:
-            details += f" - {description}"
+        return created_items
+
+
+def _create_work_items_bulk(conn: sqlite3.Connection, project_id: str, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Create work items from specs on an open connection, without committing.
+    
+    The caller must already hold the write lock (BEGIN IMMEDIATE), since ids
+    are assigned from MAX(id) before inserting.
+    """
+    # Validate the whole batch first so an invalid spec writes nothing
+    types_by_key = {}
+    for spec in specs:
+        item_type = spec['type']
+        if 'parent' in spec:
+            if spec['parent'] not in types_by_key:
+                raise ValueError(f"Unknown parent key '{spec['parent']}' for '{spec['title']}'")
+            if item_type not in HIERARCHY_RULES:
+                raise ValueError(f"Invalid item type: {item_type}. Must be one of: {list(HIERARCHY_RULES.keys())}")
             
-        log_to_changelog(new_id, project_id, "created", details)
+            parent_type = types_by_key[spec['parent']]
+            if (parent_type, item_type) not in _VALID_PARENT_CHILD:
+                raise InvalidHierarchyError(
+                    f"{item_type} items cannot be children of {parent_type}. Valid parents: {HIERARCHY_RULES[item_type]}",
+                    item_type=item_type,
+                    parent_type=parent_type
+                )
+        else:
+            _validate_hierarchy(conn, project_id, item_type, spec.get('parent_id'))
         
-        return created_item
+        if 'key' in spec:
+            types_by_key[spec['key']] = item_type
+    
+    first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM work_items").fetchone()[0]
+    
+    ids_by_key = {}
+    next_order = {}  # parent_id -> order_index for the next child
+    rows = []
+    changelog_rows = []
+    
+    for item_id, spec in enumerate(specs, start=first_id):
+        if 'parent' in spec:
+            parent_id = ids_by_key[spec['parent']]
+            next_order.setdefault(parent_id, 10)  # New parent, no existing siblings
+        else:
+            parent_id = spec.get('parent_id')
+            if parent_id not in next_order:
+                next_order[parent_id] = _next_order_index(conn, project_id, parent_id)
+        
+        order_index = next_order[parent_id]
+        next_order[parent_id] = order_index + 10
+        
+        if 'key' in spec:
+            ids_by_key[spec['key']] = item_id
+        
+        description = spec.get('description')
+        rows.append([
+            item_id, project_id, spec['type'], spec['title'], description,
+            parent_id, spec.get('notes'), order_index
+        ])
+        changelog_rows.append([
+            item_id, project_id, "created",
+            _creation_details(spec['type'], spec['title'], parent_id, description)
+        ])
+    
+    conn.executemany('''
+        INSERT INTO work_items (
+            id, project_id, type, title, description, parent_id, notes, order_index,
+            status, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'not_started', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+    ''', rows)
+    
+    conn.executemany('''
+        INSERT INTO changelog (work_item_id, project_id, action, details, created_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', changelog_rows)
+    
+    cursor = conn.execute(f'''
+        SELECT {_WORK_ITEM_SELECT_LIST}
+        FROM work_items WHERE id >= ? AND id < ?
+        ORDER BY id
+    ''', [first_id, first_id + len(specs)])
+    
+    created_items = [dict(row) for row in cursor.fetchall()]
+    
+    logger.info(f"Created {len(created_items)} work items in project {project_id}")
+    
+    return created_items
+
+
+def _next_order_index(conn: sqlite3.Connection, project_id: str, parent_id: Optional[int]) -> float:
+    """
+    Get the order_index for a new child of parent_id: max sibling order + 10.
+    
+    Args:
+        conn: Open database connection
+        project_id: Project identifier
+        parent_id: Parent item ID (None for top-level)
+        
+    Returns:
+        Order index for the new item
+    """
+    if parent_id is None:
+        # Top-level item, get max order for items with no parent in this project
+        cursor = conn.execute(
+            "SELECT COALESCE(MAX(order_index), 0) FROM work_items WHERE project_id = ? AND parent_id IS NULL",
+            [project_id]
+        )
+    else:
+        # Child item, get max order for siblings with same parent
+        cursor = conn.execute(
+            "SELECT COALESCE(MAX(order_index), 0) FROM work_items WHERE project_id = ? AND parent_id = ?",
+            [project_id, parent_id]
+        )
+    
+    return cursor.fetchone()[0] + 10
+
+
+def _creation_details(item_type: str, title: str, parent_id: Optional[int], description: Optional[str]) -> str:
+    """Build the changelog details string for a newly created item."""
+    details = f"Created {item_type}: '{title}'"
+    if parent_id:
+        details += f" (parent: {parent_id})"
+    if description:
+        details += f" - {description}"
+    return details
 
 
 def update_work_item(item_id: int, project_id: str, **updates) -> Dict[str, Any]:
@@ -476,6 +949,14 @@ def update_work_item(item_id: int, project_id: str, **updates) -> Dict[str, Any]
     Raises:
         ValueError: If item doesn't exist, belongs to wrong project, or invalid field updates
     """
+    with get_connection() as conn:
+        updated_item = _update_work_item(conn, item_id, project_id, updates)
+        conn.commit()
+        return updated_item
+
+
+def _update_work_item(conn: sqlite3.Connection, item_id: int, project_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate and apply updates to a work item on an open connection, without committing."""
     if not updates:
         raise ValueError("No updates provided")
     
@@ -511,92 +992,91 @@ def update_work_item(item_id: int, project_id: str, **updates) -> Dict[str, Any]
         if field == 'type' and value not in VALID_TYPES:
             raise ValueError(f"Invalid type '{value}'. Must be one of: {VALID_TYPES}")
     
-    with get_connection() as conn:
-        # First, verify the item exists and belongs to the project
-        cursor = conn.execute(
-            "SELECT * FROM work_items WHERE id = ? AND project_id = ?",
-            [item_id, project_id]
-        )
-        existing_item_row = cursor.fetchone()
-        
-        if not existing_item_row:
-            raise ValueError(f"Work item {item_id} not found in project {project_id}")
-        
-        existing_item = dict(existing_item_row)
-        
-        # Prevent changing project_id to maintain project isolation
-        if 'project_id' in updates:
-            raise ValueError("Cannot change project_id - this would break project isolation")
-        
-        # Validate status transitions are logical
-        if 'status' in updates:
-            _validate_status_transition(existing_item['status'], updates['status'])
-        
-        # If updating parent_id or type, validate hierarchy rules
-        new_type = updates.get('type', existing_item['type'])
-        new_parent_id = updates.get('parent_id', existing_item['parent_id'])
-        
-        # Validate type changes don't break hierarchy rules
-        if 'type' in updates:
-            _validate_type_change(item_id, existing_item['type'], new_type, project_id)
-        
-        # Ensure parent_id changes maintain valid hierarchy
-        if 'parent_id' in updates:
-            _validate_parent_change(item_id, existing_item['parent_id'], new_parent_id, new_type, project_id)
-        
-        # If updating both parent_id and type, validate the combination
-        if 'type' in updates or 'parent_id' in updates:
-            _validate_hierarchy(project_id, new_type, new_parent_id)
-        
-        # Build the UPDATE SQL dynamically
-        set_clauses = []
-        params = []
-        
-        for field, value in updates.items():
-            set_clauses.append(f"{field} = ?")
-            params.append(value)
-        
-        # Always update the updated_at timestamp
-        set_clauses.append("updated_at = CURRENT_TIMESTAMP")
-        
-        # Add the WHERE clause parameters
-        params.extend([item_id, project_id])
-        
-        # Execute the update
-        update_sql = f"""
-            UPDATE work_items 
-            SET {', '.join(set_clauses)}
-            WHERE id = ? AND project_id = ?
-        """
-        
-        conn.execute(update_sql, params)
-        
-        # Get the updated item
-        cursor = conn.execute(
-            "SELECT * FROM work_items WHERE id = ? AND project_id = ?",
-            [item_id, project_id]
-        )
-        updated_item = dict(cursor.fetchone())
-        
-        conn.commit()
-        logger.info(f"Updated work item {item_id} in project {project_id}: {list(updates.keys())}")
-        
-        # Log the update to changelog
-        details = f"Updated fields: {', '.join(updates.keys())}"
-        for field, value in updates.items():
-            old_value = existing_item.get(field)
-            details += f"\n  {field}: '{old_value}' → '{value}'"
-        
-        log_to_changelog(item_id, project_id, "updated", details)
-        
-        return updated_item
+    # First, verify the item exists and belongs to the project
+    cursor = conn.execute(
+        f"SELECT {_WORK_ITEM_SELECT_LIST} FROM work_items WHERE id = ? AND project_id = ?",
+        [item_id, project_id]
+    )
+    existing_item_row = cursor.fetchone()
+    
+    if not existing_item_row:
+        raise ValueError(f"Work item {item_id} not found in project {project_id}")
+    
+    existing_item = dict(existing_item_row)
+    
+    # Prevent changing project_id to maintain project isolation
+    if 'project_id' in updates:
+        raise ValueError("Cannot change project_id - this would break project isolation")
+    
+    # Validate status transitions are logical
+    if 'status' in updates:
+        _validate_status_transition(existing_item['status'], updates['status'])
+    
+    # If updating parent_id or type, validate hierarchy rules
+    new_type = updates.get('type', existing_item['type'])
+    new_parent_id = updates.get('parent_id', existing_item['parent_id'])
+    
+    # Validate type changes don't break hierarchy rules
+    if 'type' in updates:
+        _validate_type_change(conn, item_id, existing_item['type'], new_type, project_id)
+    
+    # Ensure parent_id changes maintain valid hierarchy
+    if 'parent_id' in updates:
+        _validate_parent_change(conn, item_id, existing_item['parent_id'], new_parent_id, new_type, project_id)
+    
+    # If updating both parent_id and type, validate the combination
+    if 'type' in updates or 'parent_id' in updates:
+        _validate_hierarchy(conn, project_id, new_type, new_parent_id)
+    
+    # Build the UPDATE SQL dynamically
+    set_clauses = []
+    params = []
+    
+    for field, value in updates.items():
+        set_clauses.append(f"{field} = ?")
+        params.append(value)
+    
+    # Always update the updated_at timestamp
+    set_clauses.append("updated_at = CURRENT_TIMESTAMP")
+    
+    # Add the WHERE clause parameters
+    params.extend([item_id, project_id])
+    
+    # Execute the update
+    update_sql = f"""
+        UPDATE work_items 
+        SET {', '.join(set_clauses)}
+        WHERE id = ? AND project_id = ?
+    """
+    
+    conn.execute(update_sql, params)
+    
+    # Get the updated item
+    cursor = conn.execute(
+        f"SELECT {_WORK_ITEM_SELECT_LIST} FROM work_items WHERE id = ? AND project_id = ?",
+        [item_id, project_id]
+    )
+    updated_item = dict(cursor.fetchone())
+    
+    logger.info(f"Updated work item {item_id} in project {project_id}: {list(updates.keys())}")
+    
+    # Log the update to changelog
+    details = f"Updated fields: {', '.join(updates.keys())}"
+    for field, value in updates.items():
+        old_value = existing_item.get(field)
+        details += f"\n  {field}: '{old_value}' → '{value}'"
+    
+    _log_to_changelog(conn, item_id, project_id, "updated", details)
+    
+    return updated_item
 
 
-def _validate_hierarchy(project_id: str, item_type: str, parent_id: Optional[int]) -> None:
+def _validate_hierarchy(conn: sqlite3.Connection, project_id: str, item_type: str, parent_id: Optional[int]) -> None:
     """
     Validate hierarchy rules for work item creation.
     
     Args:
+        conn: Open database connection
         project_id: Project identifier
         item_type: Type of item being created
         parent_id: Parent item ID (None for top-level)
@@ -604,54 +1084,57 @@ def _validate_hierarchy(project_id: str, item_type: str, parent_id: Optional[int
     Raises:
         ValueError: If hierarchy validation fails
     """
-    # Define valid hierarchy rules
-    HIERARCHY_RULES = {
-        'project': [None],  # Projects can only be top-level (no parent)
-        'phase': ['project'],  # Phases can only be under projects
-        'task': ['project', 'phase'],  # Tasks can be under projects or phases
-        'subtask': ['task']  # Subtasks can only be under tasks
-    }
-    
     if item_type not in HIERARCHY_RULES:
         raise ValueError(f"Invalid item type: {item_type}. Must be one of: {list(HIERARCHY_RULES.keys())}")
     
     # Check if parent_id is None (top-level item)
     if parent_id is None:
-        if None not in HIERARCHY_RULES[item_type]:
-            raise ValueError(f"{item_type} items cannot be top-level. Valid parents: {HIERARCHY_RULES[item_type]}")
+        if item_type not in _TOP_LEVEL_ALLOWED:
+            raise OrphanNotAllowedError(
+                f"{item_type} items cannot be top-level. Valid parents: {HIERARCHY_RULES[item_type]}",
+                item_type=item_type
+            )
         return  # No further validation needed for top-level items
     
     # Get parent item information
-    with get_connection() as conn:
-        cursor = conn.execute(
-            "SELECT id, project_id, type FROM work_items WHERE id = ?",
-            [parent_id]
-        )
-        parent_row = cursor.fetchone()
-        
-        if not parent_row:
-            raise ValueError(f"Parent item with ID {parent_id} does not exist")
-        
-        parent_item = dict(parent_row)
+    cursor = conn.execute(
+        "SELECT id, project_id, type FROM work_items WHERE id = ?",
+        [parent_id]
+    )
+    parent_row = cursor.fetchone()
+    
+    if not parent_row:
+        raise ParentNotFoundError(f"Parent item with ID {parent_id} does not exist", parent_id=parent_id)
+    
+    parent_item = dict(parent_row)
     
     # Validate parent belongs to same project
     if parent_item['project_id'] != project_id:
-        raise ValueError(f"Parent item belongs to different project: {parent_item['project_id']} vs {project_id}")
+        raise CrossProjectParentError(
+            f"Parent item belongs to different project: {parent_item['project_id']} vs {project_id}",
+            project_id=project_id,
+            parent_project_id=parent_item['project_id']
+        )
     
     # Validate parent type is allowed for this item type
     parent_type = parent_item['type']
-    if parent_type not in HIERARCHY_RULES[item_type]:
-        raise ValueError(f"{item_type} items cannot be children of {parent_type}. Valid parents: {HIERARCHY_RULES[item_type]}")
+    if (parent_type, item_type) not in _VALID_PARENT_CHILD:
+        raise InvalidHierarchyError(
+            f"{item_type} items cannot be children of {parent_type}. Valid parents: {HIERARCHY_RULES[item_type]}",
+            item_type=item_type,
+            parent_type=parent_type
+        )
     
     # Check for circular references by traversing up the hierarchy
-    _check_circular_reference(parent_id, project_id, max_depth=4)
+    _check_circular_reference(conn, parent_id, project_id, max_depth=4)
 
 
-def _check_circular_reference(parent_id: int, project_id: str, max_depth: int = 4) -> None:
+def _check_circular_reference(conn: sqlite3.Connection, parent_id: int, project_id: str, max_depth: int = 4) -> None:
     """
     Check for circular references and enforce maximum hierarchy depth.
     
     Args:
+        conn: Open database connection
         parent_id: Starting parent ID
         project_id: Project identifier for scoping
         max_depth: Maximum allowed hierarchy depth
@@ -663,30 +1146,29 @@ def _check_circular_reference(parent_id: int, project_id: str, max_depth: int =
     current_id = parent_id
     depth = 0
     
-    with get_connection() as conn:
-        while current_id is not None and depth < max_depth:
-            # Check for circular reference
-            if current_id in visited_ids:
-                raise ValueError(f"Circular reference detected in hierarchy at item {current_id}")
-            
-            visited_ids.add(current_id)
-            depth += 1
-            
-            # Get parent of current item
-            cursor = conn.execute(
-                "SELECT parent_id FROM work_items WHERE id = ? AND project_id = ?",
-                [current_id, project_id]
-            )
-            row = cursor.fetchone()
-            
-            if not row:
-                break  # Item not found or doesn't belong to project
-                
-            current_id = row[0]
+    while current_id is not None and depth < max_depth:
+        # Check for circular reference
+        if current_id in visited_ids:
+            raise CircularReferenceError(f"Circular reference detected in hierarchy at item {current_id}")
         
-        # Check if we exceeded max depth
-        if depth >= max_depth:
-            raise ValueError(f"Maximum hierarchy depth ({max_depth}) exceeded")
+        visited_ids.add(current_id)
+        depth += 1
+        
+        # Get parent of current item
+        cursor = conn.execute(
+            "SELECT parent_id FROM work_items WHERE id = ? AND project_id = ?",
+            [current_id, project_id]
+        )
+        row = cursor.fetchone()
+        
+        if not row:
+            break  # Item not found or doesn't belong to project
+            
+        current_id = row[0]
+    
+    # Check if we exceeded max depth
+    if depth >= max_depth:
+        raise HierarchyError(f"Maximum hierarchy depth ({max_depth}) exceeded")
 
 
 def _validate_status_transition(current_status: str, new_status: str) -> None:
@@ -717,11 +1199,12 @@ def _validate_status_transition(current_status: str, new_status: str) -> None:
                         f"Valid transitions: {valid_next_statuses}")
 
 
-def _validate_type_change(item_id: int, current_type: str, new_type: str, project_id: str) -> None:
+def _validate_type_change(conn: sqlite3.Connection, item_id: int, current_type: str, new_type: str, project_id: str) -> None:
     """
     Validate that type changes don't break hierarchy rules by checking children.
     
     Args:
+        conn: Open database connection
         item_id: ID of the item being changed
         current_type: Current type of the item
         new_type: Proposed new type
@@ -743,12 +1226,11 @@ def _validate_type_change(item_id: int, current_type: str, new_type: str, projec
     }
     
     # Get all children of this item
-    with get_connection() as conn:
-        cursor = conn.execute(
-            "SELECT type FROM work_items WHERE parent_id = ? AND project_id = ?",
-            [item_id, project_id]
-        )
-        child_types = [row[0] for row in cursor.fetchall()]
+    cursor = conn.execute(
+        "SELECT type FROM work_items WHERE parent_id = ? AND project_id = ?",
+        [item_id, project_id]
+    )
+    child_types = [row[0] for row in cursor.fetchall()]
     
     # If no children, type change is safe
     if not child_types:
@@ -764,12 +1246,13 @@ def _validate_type_change(item_id: int, current_type: str, new_type: str, projec
                            f"'{new_type}' can only have children of types: {allowed_children_for_new_type}")
 
 
-def _validate_parent_change(item_id: int, current_parent_id: Optional[int], new_parent_id: Optional[int], 
-                          item_type: str, project_id: str) -> None:
+def _validate_parent_change(conn: sqlite3.Connection, item_id: int, current_parent_id: Optional[int],
+                          new_parent_id: Optional[int], item_type: str, project_id: str) -> None:
     """
     Validate that parent_id changes maintain valid hierarchy and don't create circular references.
     
     Args:
+        conn: Open database connection
         item_id: ID of the item being changed
         current_parent_id: Current parent ID (None for top-level)
         new_parent_id: Proposed new parent ID (None for top-level)
@@ -785,87 +1268,72 @@ def _validate_parent_change(item_id: int, current_parent_id: Optional[int], new_
     
     # If setting to None (making top-level), just validate type allows it
     if new_parent_id is None:
-        if item_type not in ['project']:
-            raise ValueError(f"Cannot make {item_type} top-level. Only projects can be top-level.")
+        if item_type not in _TOP_LEVEL_ALLOWED:
+            raise OrphanNotAllowedError(
+                f"Cannot make {item_type} top-level. Only projects can be top-level.",
+                item_type=item_type
+            )
         return
     
     # Check that new parent exists and belongs to same project
-    with get_connection() as conn:
-        cursor = conn.execute(
-            "SELECT type FROM work_items WHERE id = ? AND project_id = ?",
-            [new_parent_id, project_id]
+    cursor = conn.execute(
+        "SELECT type FROM work_items WHERE id = ? AND project_id = ?",
+        [new_parent_id, project_id]
+    )
+    parent_row = cursor.fetchone()
+    
+    if not parent_row:
+        raise ParentNotFoundError(
+            f"New parent item {new_parent_id} not found in project {project_id}",
+            parent_id=new_parent_id
         )
-        parent_row = cursor.fetchone()
-        
-        if not parent_row:
-            raise ValueError(f"New parent item {new_parent_id} not found in project {project_id}")
-        
-        new_parent_type = parent_row[0]
     
-    # Validate hierarchy rules for the new parent-child relationship
-    HIERARCHY_RULES = {
-        'project': [None],
-        'phase': ['project'],
-        'task': ['project', 'phase'],
-        'subtask': ['task']
-    }
+    new_parent_type = parent_row[0]
     
-    allowed_parents = HIERARCHY_RULES.get(item_type, [])
-    if new_parent_type not in allowed_parents:
-        raise ValueError(f"Cannot move {item_type} under {new_parent_type}. "
-                        f"Valid parents for {item_type}: {allowed_parents}")
+    # Validate hierarchy rules for the new parent-child relationship
+    if (new_parent_type, item_type) not in _VALID_PARENT_CHILD:
+        raise InvalidHierarchyError(
+            f"Cannot move {item_type} under {new_parent_type}. "
+            f"Valid parents for {item_type}: {HIERARCHY_RULES.get(item_type, [])}",
+            item_type=item_type,
+            parent_type=new_parent_type
+        )
     
     # Check for circular reference: ensure we're not trying to move an item under one of its descendants
-    _validate_not_descendant(item_id, new_parent_id, project_id)
+    _validate_not_descendant(conn, item_id, new_parent_id, project_id)
 
 
-def _validate_not_descendant(item_id: int, potential_parent_id: int, project_id: str) -> None:
+def _validate_not_descendant(conn: sqlite3.Connection, item_id: int, potential_parent_id: int, project_id: str) -> None:
     """
     Ensure we're not creating a circular reference by making an item a child of its descendant.
     
+    Walks up the ancestor chain of the proposed parent and stops as soon as
+    the item being moved is found, so the cost is bounded by the depth of the
+    tree rather than the size of the item's subtree.
+    
     Args:
+        conn: Open database connection
         item_id: ID of the item being moved
         potential_parent_id: ID of the proposed new parent
         project_id: Project identifier
         
     Raises:
-        ValueError: If potential_parent_id is a descendant of item_id
-    """
-    # Get all descendants of the item being moved
-    descendants = _get_all_descendants(item_id, project_id)
-    
-    if potential_parent_id in descendants:
-        raise ValueError(f"Cannot move item {item_id} under item {potential_parent_id}: "
-                        f"would create circular reference (target is a descendant)")
-
-
-def _get_all_descendants(item_id: int, project_id: str) -> set:
-    """
-    Get all descendant IDs of a given item.
-    
-    Args:
-        item_id: ID of the parent item
-        project_id: Project identifier
-        
-    Returns:
-        Set of all descendant item IDs
+        CircularReferenceError: If potential_parent_id is item_id or one of its descendants
     """
-    descendants = set()
-    
-    with get_connection() as conn:
-        # Get direct children
-        cursor = conn.execute(
-            "SELECT id FROM work_items WHERE parent_id = ? AND project_id = ?",
-            [item_id, project_id]
-        )
-        direct_children = [row[0] for row in cursor.fetchall()]
-    
-    # Add direct children and recursively get their descendants
-    for child_id in direct_children:
-        descendants.add(child_id)
-        descendants.update(_get_all_descendants(child_id, project_id))
-    
-    return descendants
+    visited = set()
+    current_id = potential_parent_id
+    
+    while current_id is not None and current_id not in visited:
+        if current_id == item_id:
+            raise CircularReferenceError(f"Cannot move item {item_id} under item {potential_parent_id}: "
+                                         f"would create circular reference (target is a descendant)")
+        visited.add(current_id)
+        
+        row = conn.execute(
+            "SELECT parent_id FROM work_items WHERE id = ? AND project_id = ?",
+            [current_id, project_id]
+        ).fetchone()
+        current_id = row[0] if row else None
 
 
 def log_to_changelog(work_item_id: int, project_id: str, action: str, details: str) -> None:
@@ -880,19 +1348,28 @@ def log_to_changelog(work_item_id: int, project_id: str, action: str, details: s
     """
     try:
         with get_connection() as conn:
-            conn.execute('''
-                INSERT INTO changelog (work_item_id, project_id, action, details, created_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-            ''', [work_item_id, project_id, action, details])
-            
+            _log_to_changelog(conn, work_item_id, project_id, action, details)
             conn.commit()
-            logger.info(f"Logged {action} for work item {work_item_id} in project {project_id}")
             
     except Exception as e:
         # Handle logging errors gracefully - don't fail the main operation
         logger.error(f"Failed to log to changelog: {e}")
 
 
+def _log_to_changelog(conn: sqlite3.Connection, work_item_id: int, project_id: str, action: str, details: str) -> None:
+    """Write a changelog entry on an open connection, as part of the caller's transaction."""
+    try:
+        conn.execute('''
+            INSERT INTO changelog (work_item_id, project_id, action, details, created_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', [work_item_id, project_id, action, details])
+        logger.info(f"Logged {action} for work item {work_item_id} in project {project_id}")
+        
+    except sqlite3.Error as e:
+        # A failed statement leaves the rest of the transaction intact
+        logger.error(f"Failed to log to changelog: {e}")
+
+
 def complete_item(item_id: int, project_id: str) -> Dict[str, Any]:
     """
     Mark a work item as completed with timestamp.
@@ -911,46 +1388,193 @@ def complete_item(item_id: int, project_id: str) -> Dict[str, Any]:
         ValueError: If item doesn't exist or belongs to wrong project
     """
     with get_connection() as conn:
-        # First, verify the item exists and belongs to the project
-        cursor = conn.execute(
-            "SELECT * FROM work_items WHERE id = ? AND project_id = ?",
-            [item_id, project_id]
-        )
-        existing_item_row = cursor.fetchone()
-        
-        if not existing_item_row:
-            raise ValueError(f"Work item {item_id} not found in project {project_id}")
-        
-        existing_item = dict(existing_item_row)
+        completed_item = _complete_item(conn, item_id, project_id)
+        conn.commit()
+        return completed_item
+
+
+def _complete_item(conn: sqlite3.Connection, item_id: int, project_id: str) -> Dict[str, Any]:
+    """Mark a work item as completed on an open connection, without committing."""
+    # First, verify the item exists and belongs to the project
+    cursor = conn.execute(
+        f"SELECT {_WORK_ITEM_SELECT_LIST} FROM work_items WHERE id = ? AND project_id = ?",
+        [item_id, project_id]
+    )
+    existing_item_row = cursor.fetchone()
+    
+    if not existing_item_row:
+        raise ValueError(f"Work item {item_id} not found in project {project_id}")
+    
+    existing_item = dict(existing_item_row)
+    
+    # Check if already completed
+    if existing_item['status'] == 'completed':
+        logger.info(f"Work item {item_id} is already completed")
+        return existing_item
+    
+    # Update status to completed and set updated_at timestamp
+    completion_time = datetime.now()
+    conn.execute('''
+        UPDATE work_items 
+        SET status = 'completed', updated_at = CURRENT_TIMESTAMP
+        WHERE id = ? AND project_id = ?
+    ''', [item_id, project_id])
+    
+    # Get the updated item with completion timestamp
+    cursor = conn.execute(
+        f"SELECT {_WORK_ITEM_SELECT_LIST} FROM work_items WHERE id = ? AND project_id = ?",
+        [item_id, project_id]
+    )
+    completed_item = dict(cursor.fetchone())
+    
+    logger.info(f"Completed work item {item_id} in project {project_id}: {completed_item['title']}")
+    
+    # Log completion to changelog
+    details = f"Item completed: {completed_item['title']}"
+    _log_to_changelog(conn, item_id, project_id, "completed", details)
+    
+    return completed_item
+
+
+def complete_items_bulk(item_ids: List[int], project_id: str) -> List[Dict[str, Any]]:
+    """
+    Mark several work items as completed with a single UPDATE.
+    
+    Items that are already completed are left untouched and get no new
+    changelog entry, matching complete_item.
+    
+    Args:
+        item_ids: IDs of the work items to complete
+        project_id: Project identifier for validation
         
-        # Check if already completed
-        if existing_item['status'] == 'completed':
-            logger.info(f"Work item {item_id} is already completed")
-            return existing_item
+    Returns:
+        List of the completed work items, in the same order as item_ids
         
-        # Update status to completed and set updated_at timestamp
-        completion_time = datetime.now()
-        conn.execute('''
+    Raises:
+        ValueError: If any item doesn't exist or belongs to wrong project
+    """
+    with get_connection() as conn:
+        completed_items = _complete_items_bulk(conn, item_ids, project_id)
+        conn.commit()
+        return completed_items
+
+
+def _complete_items_bulk(conn: sqlite3.Connection, item_ids: List[int], project_id: str) -> List[Dict[str, Any]]:
+    """Mark several work items as completed on an open connection, without committing."""
+    item_ids = list(dict.fromkeys(item_ids))  # Drop duplicates, keep order
+    if not item_ids:
+        return []
+    
+    placeholders = ','.join('?' for _ in item_ids)
+    
+    # Verify every item exists and belongs to the project before writing
+    cursor = conn.execute(
+        f"SELECT id, title, status FROM work_items WHERE project_id = ? AND id IN ({placeholders})",
+        [project_id] + item_ids
+    )
+    existing = {row['id']: row for row in cursor.fetchall()}
+    
+    missing = [item_id for item_id in item_ids if item_id not in existing]
+    if missing:
+        raise ValueError(f"Work items {missing} not found in project {project_id}")
+    
+    to_complete = [item_id for item_id in item_ids if existing[item_id]['status'] != 'completed']
+    if to_complete:
+        conn.execute(f'''
             UPDATE work_items 
             SET status = 'completed', updated_at = CURRENT_TIMESTAMP
-            WHERE id = ? AND project_id = ?
-        ''', [item_id, project_id])
-        
-        # Get the updated item with completion timestamp
-        cursor = conn.execute(
-            "SELECT * FROM work_items WHERE id = ? AND project_id = ?",
-            [item_id, project_id]
-        )
-        completed_item = dict(cursor.fetchone())
-        
-        conn.commit()
-        logger.info(f"Completed work item {item_id} in project {project_id}: {completed_item['title']}")
-        
-        # Log completion to changelog
-        details = f"Item completed: {completed_item['title']}"
-        log_to_changelog(item_id, project_id, "completed", details)
+            WHERE project_id = ? AND id IN ({','.join('?' for _ in to_complete)})
+        ''', [project_id] + to_complete)
+        
+        # Log completions to changelog in the same transaction
+        conn.executemany('''
+            INSERT INTO changelog (work_item_id, project_id, action, details, created_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ''', [
+            [item_id, project_id, "completed", f"Item completed: {existing[item_id]['title']}"]
+            for item_id in to_complete
+        ])
+    
+    cursor = conn.execute(
+        f"SELECT {_WORK_ITEM_SELECT_LIST} FROM work_items WHERE project_id = ? AND id IN ({placeholders})",
+        [project_id] + item_ids
+    )
+    completed_items = {row['id']: dict(row) for row in cursor.fetchall()}
+    
+    logger.info(f"Completed {len(to_complete)} work items in project {project_id}")
+    
+    return [completed_items[item_id] for item_id in item_ids]
+
+
+class WorkItemSession:
+    """
+    Run several work item mutations on one connection, in one transaction.
+    
+    The module-level create/update/complete functions each open a connection
+    and commit on their own. A session holds a single connection for the
+    whole block and commits once when it exits, or rolls everything back if
+    the block raises. Writes are not visible to other connections until the
+    session exits, so read results back afterwards.
+    
+    Use via work_item_txn():
+        with work_item_txn(project_id) as session:
+            task = session.create_work_item('task', 'Write docs', parent_id=project_item_id)
+            session.complete_item(task['id'])
+    """
+    
+    def __init__(self, project_id: str):
+        self.project_id = project_id
+        self.conn = None
+    
+    def __enter__(self) -> 'WorkItemSession':
+        self.conn = get_connection()
+        # Take the write lock up front so the session never has to upgrade mid-way
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+            self.conn = None
+    
+    def create_work_item(self, item_type: str, title: str, description: str = None,
+                         parent_id: Optional[int] = None, notes: str = None) -> Dict[str, Any]:
+        """Create a work item in the session. See create_work_item()."""
+        return _create_work_item(self.conn, self.project_id, item_type, title, description, parent_id, notes)
+    
+    def update_work_item(self, item_id: int, **updates) -> Dict[str, Any]:
+        """Update a work item in the session. See update_work_item()."""
+        return _update_work_item(self.conn, item_id, self.project_id, updates)
+    
+    def complete_item(self, item_id: int) -> Dict[str, Any]:
+        """Mark a work item as completed in the session. See complete_item()."""
+        return _complete_item(self.conn, item_id, self.project_id)
+    
+    def create_work_items_bulk(self, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many work items in the session. See create_work_items_bulk()."""
+        return _create_work_items_bulk(self.conn, self.project_id, specs)
+    
+    def complete_items_bulk(self, item_ids: List[int]) -> List[Dict[str, Any]]:
+        """Mark several work items as completed in the session. See complete_items_bulk()."""
+        return _complete_items_bulk(self.conn, item_ids, self.project_id)
+
+
+def work_item_txn(project_id: str) -> WorkItemSession:
+    """
+    Open a WorkItemSession for a project, for use in a with statement.
+    
+    Args:
+        project_id: Project identifier that every mutation in the session applies to
         
-        return completed_item
+    Returns:
+        WorkItemSession that commits on exit or rolls back on exception
+    """
+    return WorkItemSession(project_id)
 
 
 def search_work_items(project_id: str, query: str) -> List[Dict[str, Any]]:
@@ -978,8 +1602,8 @@ def search_work_items(project_id: str, query: str) -> List[Dict[str, Any]]:
     
     with get_connection() as conn:
         # Search in both title and description fields with case-insensitive matching
-        cursor = conn.execute('''
-            SELECT * FROM work_items 
+        cursor = conn.execute(f'''
+            SELECT {_WORK_ITEM_SELECT_LIST} FROM work_items 
             WHERE project_id = ? 
             AND (
                 title LIKE ? COLLATE NOCASE 
@@ -1011,7 +1635,7 @@ def _build_breadcrumb_path(item: Dict[str, Any], all_items_by_id: Dict[int, Dict
     
     Args:
         item: The target item to build path for
-        all_items_by_id: Dictionary of all items indexed by id for quick lookup
+        all_items_by_id: All items (dicts or sqlite3.Row) indexed by id for quick lookup
         
     Returns:
         List of parent items in order from root to immediate parent
@@ -1023,7 +1647,7 @@ def _build_breadcrumb_path(item: Dict[str, Any], all_items_by_id: Dict[int, Dict
     depth = 0
     
     # Walk up the parent chain
-    while current_item.get('parent_id') is not None and depth < max_depth:
+    while current_item['parent_id'] is not None and depth < max_depth:
         parent_id = current_item['parent_id']
         parent_item = all_items_by_id.get(parent_id)
         
@@ -1031,7 +1655,7 @@ def _build_breadcrumb_path(item: Dict[str, Any], all_items_by_id: Dict[int, Dict
             # Orphaned item - parent doesn't exist
             break
             
-        breadcrumb.insert(0, parent_item)  # Insert at beginning to maintain order
+        breadcrumb.insert(0, dict(parent_item))  # Insert at beginning to maintain order
         current_item = parent_item
         depth += 1
     
@@ -1061,13 +1685,12 @@ def search_work_items_with_context(project_id: str, query: str) -> List[Dict[str
     # Get all items in the project for building breadcrumbs
     with get_connection() as conn:
         cursor = conn.execute(
-            "SELECT * FROM work_items WHERE project_id = ? ORDER BY id",
+            f"SELECT {_WORK_ITEM_SELECT_LIST} FROM work_items WHERE project_id = ? ORDER BY id",
             [project_id]
         )
-        all_items = [dict(row) for row in cursor.fetchall()]
-    
-    # Create lookup dictionary for fast parent resolution
-    all_items_by_id = {item['id']: item for item in all_items}
+        # Keep the sqlite3.Row objects: only the ancestors of matches are
+        # ever copied into dicts, by _build_breadcrumb_path
+        all_items_by_id = {row['id']: row for row in cursor.fetchall()}
     
     # Get search results using the existing search function
     search_results = search_work_items(project_id, query)
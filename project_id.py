@@ -6,6 +6,7 @@ from agent-provided project context information.
 """
 
 import base64
+from functools import lru_cache
 from typing import Dict
 
 
@@ -29,15 +30,23 @@ def get_project_id(project_info: str) -> Dict[str, str]:
     if not project_info or not isinstance(project_info, str):
         raise ValueError("project_info must be a non-empty string")
     
-    # Convert project info string to consistent base64 ID
-    project_id = base64.b64encode(project_info.encode('utf-8')).decode('ascii')
-    
     return {
-        "project_id": project_id,
+        "project_id": _encode_project_id(project_info),
         "raw_value": project_info
     }
 
 
+@lru_cache(maxsize=128)
+def _encode_project_id(project_info: str) -> str:
+    """
+    Convert project info string to consistent base64 ID.
+    
+    Cached because callers resolve the same few projects over and over; the
+    result dict is built fresh in get_project_id so callers can't mutate the cache.
+    """
+    return base64.b64encode(project_info.encode('utf-8')).decode('ascii')
+
+
 if __name__ == "__main__":
     # Test the function when run directly
     test_cases = [
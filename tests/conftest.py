@@ -4,50 +4,138 @@ Test configuration and fixtures for MCP Task Management Server tests.
 
 import pytest
 import os
-import sys
-import tempfile
 import sqlite3
-from pathlib import Path
-
-# Add the parent directory to Python path so we can import our modules
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from itertools import count
+from contextlib import contextmanager
+from typing import Tuple
 
 from database import init_database, get_connection, DATABASE_PATH
 from project_id import get_project_id as get_project_id_func
 
-# Test database path - use a temporary file for tests
+# Test database URI - an in-memory database shared across connections
 TEST_DB_PATH = None
 
-@pytest.fixture(scope="function")
-def test_db():
-    """
-    Create a temporary database for each test function.
-    This ensures test isolation and prevents test data pollution.
+# Tables whose rows are rolled back by database checkpoints
+CHECKPOINT_TABLES = ('work_items', 'changelog')
+
+# Numbers the snapshot tables of nested checkpoints
+_checkpoint_ids = count()
+
+
+def _worker_id() -> str:
+    """Return the pytest-xdist worker id, or 'master' when not running distributed."""
+    return os.environ.get('PYTEST_XDIST_WORKER', 'master')
+
+
+def _create_test_database() -> Tuple[str, sqlite3.Connection]:
     """
-    global TEST_DB_PATH
+    Create and initialize an in-memory test database, pointing the database module at it.
     
-    # Create a temporary database file
-    fd, TEST_DB_PATH = tempfile.mkstemp(suffix='.db')
-    os.close(fd)
+    The database lives in SQLite's shared cache so every connection opened by
+    the database module sees the same data. It only exists while at least one
+    connection is open, so the returned keeper connection must stay open for
+    as long as the database is needed.
+    """
+    # One database per xdist worker so parallel runs never share state
+    uri = f'file:tasks_{_worker_id()}?mode=memory&cache=shared'
+    keeper = sqlite3.connect(uri, uri=True)
     
-    # Temporarily patch the database path
-    original_path = DATABASE_PATH
+    init_database(uri)
+    return uri, keeper
+
+
+def _remove_test_database(keeper: sqlite3.Connection) -> None:
+    """Restore the original database path and drop the in-memory test database."""
     import database
-    database.DATABASE_PATH = TEST_DB_PATH
     
-    # Initialize the test database
-    init_database()
+    database.DATABASE_PATH = DATABASE_PATH
+    keeper.close()
+
+
+@contextmanager
+def _database_checkpoint():
+    """
+    Roll the database back to its current state on exit.
     
-    yield TEST_DB_PATH
+    The database module opens a fresh, autocommitting connection for every
+    operation, so a SAVEPOINT held on a fixture connection cannot undo its
+    writes. Instead, copy each table into a snapshot table and restore it on
+    exit, which also undoes updates and deletes of rows from outer scopes.
+    """
+    checkpoint = next(_checkpoint_ids)
+    snapshots = {table: f"_checkpoint_{checkpoint}_{table}" for table in CHECKPOINT_TABLES}
+    
+    with get_connection() as conn:
+        for table, snapshot in snapshots.items():
+            conn.execute(f"CREATE TABLE {snapshot} AS SELECT * FROM {table}")
+        conn.commit()
     
-    # Cleanup: restore original path and remove temp file
-    database.DATABASE_PATH = original_path
     try:
-        os.unlink(TEST_DB_PATH)
-    except OSError:
-        pass
+        yield
+    finally:
+        with get_connection() as conn:
+            for table, snapshot in snapshots.items():
+                conn.execute(f"DELETE FROM {table}")
+                conn.execute(f"INSERT INTO {table} SELECT * FROM {snapshot}")
+            # The insert triggers counted every restored child again
+            conn.execute(f'''
+                UPDATE work_items SET
+                    total_children = s.total_children,
+                    completed_children = s.completed_children
+                FROM {snapshots['work_items']} AS s
+                WHERE s.id = work_items.id
+            ''')
+            for snapshot in snapshots.values():
+                conn.execute(f"DROP TABLE {snapshot}")
+            conn.commit()
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
+def session_db():
+    """
+    Create the in-memory test database once per session (per xdist worker).
+    Schema creation runs a single time; tests get isolation from checkpoints.
+    """
+    global TEST_DB_PATH
+    
+    TEST_DB_PATH, keeper = _create_test_database()
+    
+    yield TEST_DB_PATH
+    
+    _remove_test_database(keeper)
+
+
+@pytest.fixture(scope="module")
+def module_db(session_db):
+    """
+    Share database state across every test in a module.
+    Anything created by module-scoped fixtures is removed after the module.
+    """
+    with _database_checkpoint():
+        yield session_db
+
+
+@pytest.fixture(scope="class")
+def class_db(session_db):
+    """
+    Share database state across every test in a class.
+    Anything created by class-scoped fixtures is removed after the class.
+    """
+    with _database_checkpoint():
+        yield session_db
+
+
+@pytest.fixture(scope="function")
+def test_db(session_db):
+    """
+    Roll the session database back after each test function.
+    This ensures test isolation and prevents test data pollution.
+    """
+    with _database_checkpoint():
+        yield session_db
+
+
+@pytest.fixture(scope="session")
 def sample_project_id():
     """Generate a consistent test project ID."""
     return get_project_id_func("test_project_path")['project_id']
@@ -131,28 +219,31 @@ def sample_work_items():
 def populated_db(test_db, sample_work_items, sample_project_id):
     """
     Create a database populated with sample work items.
+    Returns a mapping from each sample item's id to the id it was stored under.
     """
     # Patch the database path for our database module
     import database
     original_path = database.DATABASE_PATH
     database.DATABASE_PATH = test_db
     
-    # Insert sample data
+    # Insert sample data, letting the database assign ids (parents come first)
+    ids = {}
     with get_connection() as conn:
         for item in sample_work_items:
-            conn.execute('''
+            cursor = conn.execute('''
                 INSERT INTO work_items (
-                    id, project_id, type, title, description, status, parent_id, 
+                    project_id, type, title, description, status, parent_id, 
                     order_index, notes, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
             ''', [
-                item['id'], item['project_id'], item['type'], item['title'],
-                item['description'], item['status'], item['parent_id'],
+                item['project_id'], item['type'], item['title'],
+                item['description'], item['status'], ids.get(item['parent_id']),
                 item['order_index'], item['notes']
             ])
+            ids[item['id']] = cursor.lastrowid
         conn.commit()
     
-    yield test_db
+    yield ids
     
     # Restore original path
     database.DATABASE_PATH = original_path
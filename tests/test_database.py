@@ -8,18 +8,21 @@ These tests focus on the essential database operations that power the MCP server
 - Project ID generation consistency
 """
 
-import pytest
-import sys
-from pathlib import Path
+import gc
+import logging
 
-# Add the parent directory to Python path so we can import our modules
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
 
 from database import (
     init_database, get_connection, check_database_health,
-    create_work_item, update_work_item, complete_item,
-    get_work_items_for_project, build_hierarchy, add_completion_summaries,
-    search_work_items_with_context
+    WORK_ITEM_COLUMNS, CHILD_COUNT_COLUMNS,
+    create_work_item, create_work_items_bulk, update_work_item,
+    complete_item, complete_items_bulk,
+    get_work_items_for_project, get_work_items_page, iter_work_items_paged,
+    build_hierarchy, add_completion_summaries,
+    build_hierarchy_with_summaries, get_completion_stats,
+    search_work_items_with_context, work_item_txn, temporary_database,
+    InvalidHierarchyError, OrphanNotAllowedError
 )
 from project_id import get_project_id
 
@@ -38,9 +41,12 @@ class TestDatabaseInitialization:
             
             expected_columns = {
                 'id', 'project_id', 'type', 'title', 'description', 'status',
-                'parent_id', 'notes', 'order_index', 'created_at', 'updated_at'
+                'parent_id', 'notes', 'order_index', 'created_at', 'updated_at',
+                'total_children', 'completed_children'
             }
             assert set(columns.keys()) == expected_columns
+            # The shared SELECT column list plus the child counters must match the table exactly
+            assert tuple(columns.keys()) == WORK_ITEM_COLUMNS + CHILD_COUNT_COLUMNS
             
             # Check that changelog table exists
             cursor = conn.execute("PRAGMA table_info(changelog)")
@@ -57,6 +63,101 @@ class TestDatabaseInitialization:
             assert 'idx_parent' in indexes
             assert 'idx_status' in indexes
     
+    def test_incomplete_items_query_uses_partial_index(self, test_db, sample_project_id):
+        """Test that the rolling work plan query is served by the partial index."""
+        with get_connection() as conn:
+            cursor = conn.execute("""
+                EXPLAIN QUERY PLAN
+                SELECT id FROM work_items
+                WHERE project_id = ? AND status != 'completed'
+                ORDER BY parent_id, order_index ASC, created_at ASC
+            """, [sample_project_id])
+            plan = ' '.join(row['detail'] for row in cursor.fetchall())
+        
+        assert 'USING INDEX idx_wi_incomplete' in plan
+    
+    def test_file_database_uses_wal(self, tmp_path, monkeypatch):
+        """Test that a file database switches to WAL with relaxed syncing."""
+        import database
+        monkeypatch.setattr(database, 'DATABASE_PATH', database.DATABASE_PATH)
+        monkeypatch.setattr(database, '_wal_databases', set())
+        
+        init_database(str(tmp_path / 'tasks.db'))
+        with get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    
+    def test_init_database_skips_current_schema(self, tmp_path, monkeypatch, caplog):
+        """Test that a second initialization finds the schema stamped and skips it."""
+        import database
+        monkeypatch.setattr(database, 'DATABASE_PATH', database.DATABASE_PATH)
+        monkeypatch.setattr(database, '_wal_databases', set())
+        db_file = str(tmp_path / 'tasks.db')
+        
+        init_database(db_file)
+        with get_connection() as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == database.SCHEMA_VERSION
+        
+        with caplog.at_level(logging.INFO, logger='database'):
+            init_database(db_file)
+        assert "Initializing database..." not in caplog.messages
+    
+    def test_recreated_file_database_is_set_up_again(self, tmp_path, monkeypatch, sample_project_id):
+        """Test that a database file deleted and recreated in the same process gets its schema back."""
+        import database
+        monkeypatch.setattr(database, 'DATABASE_PATH', database.DATABASE_PATH)
+        monkeypatch.setattr(database, '_wal_databases', set())
+        db_file = tmp_path / 'tasks.db'
+        
+        init_database(str(db_file))
+        gc.collect()
+        for path in tmp_path.glob('tasks.db*'):
+            path.unlink()
+        
+        init_database(str(db_file))
+        project = create_work_item(sample_project_id, 'project', 'Recreated Project')
+        assert get_work_items_for_project(sample_project_id) == [project]
+    
+    def test_temporary_database_restores_path(self, test_db, sample_project_id):
+        """Test that a temporary database is used inside the block and the old path comes back after."""
+        import database
+        scratch_uri = 'file:temporary_database_test?mode=memory&cache=shared'
+        
+        with temporary_database(scratch_uri):
+            assert database.DATABASE_PATH == scratch_uri
+            create_work_item(sample_project_id, 'project', 'Scratch Project')
+            assert [item['title'] for item in get_work_items_for_project(sample_project_id)] == ['Scratch Project']
+        
+        assert database.DATABASE_PATH == test_db
+        assert get_work_items_for_project(sample_project_id) == []
+        
+        # The scratch database went away with its keeper connection
+        gc.collect()
+        with temporary_database(scratch_uri):
+            assert get_work_items_for_project(sample_project_id) == []
+    
+    def test_checkpoint_restores_outer_rows(self, test_db, sample_project_id):
+        """Test that a checkpoint undoes updates to rows created before it, not just new rows."""
+        from conftest import _database_checkpoint
+        project, task = create_work_items_bulk(sample_project_id, [
+            {'key': 'project', 'type': 'project', 'title': 'Outer Project'},
+            {'type': 'task', 'title': 'Outer Task', 'parent': 'project'},
+        ])
+        
+        def snapshot():
+            with get_connection() as conn:
+                return {table: [tuple(row) for row in conn.execute(f"SELECT * FROM {table} ORDER BY id")]
+                        for table in ('work_items', 'changelog')}
+        
+        before = snapshot()
+        with _database_checkpoint():
+            update_work_item(project['id'], sample_project_id, title='Renamed Project')
+            complete_item(task['id'], sample_project_id)
+            create_work_item(sample_project_id, 'task', 'Inner Task', parent_id=project['id'])
+        
+        assert snapshot() == before
+        assert get_completion_stats(sample_project_id) == {project['id']: (0, 1)}
+    
     def test_database_health_check(self, test_db):
         """Test database health check functionality."""
         health = check_database_health()
@@ -128,6 +229,40 @@ class TestWorkItemCRUD:
         assert subtask['parent_id'] == task['id']
         assert subtask['type'] == 'subtask'
     
+    def test_create_work_items_bulk(self, test_db, sample_project_id):
+        """Test creating a whole hierarchy in one call, linking parents by key."""
+        project, phase, task1, task2, subtask = create_work_items_bulk(sample_project_id, [
+            {'key': 'project', 'type': 'project', 'title': 'Bulk Project'},
+            {'key': 'phase', 'type': 'phase', 'title': 'Bulk Phase', 'parent': 'project'},
+            {'key': 'task', 'type': 'task', 'title': 'Bulk Task 1', 'parent': 'phase'},
+            {'type': 'task', 'title': 'Bulk Task 2', 'parent': 'phase', 'notes': 'Some notes'},
+            {'type': 'subtask', 'title': 'Bulk Subtask', 'parent': 'task'},
+        ])
+        
+        assert project['parent_id'] is None
+        assert phase['parent_id'] == project['id']
+        assert (task1['parent_id'], task2['parent_id']) == (phase['id'], phase['id'])
+        assert subtask['parent_id'] == task1['id']
+        assert (task1['order_index'], task2['order_index']) == (10.0, 20.0)
+        assert task2['notes'] == 'Some notes'
+        assert all(item['status'] == 'not_started' for item in (project, phase, task1, task2, subtask))
+        
+        # Existing parents can be referenced by id and continue the sibling order
+        task3, = create_work_items_bulk(sample_project_id, [
+            {'type': 'task', 'title': 'Bulk Task 3', 'parent_id': phase['id']},
+        ])
+        assert task3['order_index'] == 30.0
+    
+    def test_create_work_items_bulk_invalid_batch_writes_nothing(self, test_db, sample_project_id):
+        """Test that one invalid spec rejects the whole batch."""
+        with pytest.raises(InvalidHierarchyError):
+            create_work_items_bulk(sample_project_id, [
+                {'key': 'project', 'type': 'project', 'title': 'Bulk Project'},
+                {'type': 'subtask', 'title': 'Invalid Subtask', 'parent': 'project'},
+            ])
+        
+        assert get_work_items_for_project(sample_project_id) == []
+    
     def test_update_work_item(self, test_db, sample_project_id):
         """Test updating work item fields."""
         # Create a work item to update
@@ -166,6 +301,81 @@ class TestWorkItemCRUD:
         assert completed['status'] == 'completed'
         assert completed['id'] == project['id']
     
+    def test_complete_items_bulk(self, test_db, sample_project_id):
+        """Test completing several items at once."""
+        project, task1, task2 = create_work_items_bulk(sample_project_id, [
+            {'key': 'project', 'type': 'project', 'title': 'Test Project'},
+            {'type': 'task', 'title': 'Task 1', 'parent': 'project'},
+            {'type': 'task', 'title': 'Task 2', 'parent': 'project'},
+        ])
+        complete_item(item_id=task1['id'], project_id=sample_project_id)
+        
+        completed = complete_items_bulk([task1['id'], task2['id']], sample_project_id)
+        
+        assert [item['id'] for item in completed] == [task1['id'], task2['id']]
+        assert all(item['status'] == 'completed' for item in completed)
+        
+        # Already-completed task1 should not be logged twice
+        with get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT work_item_id FROM changelog WHERE project_id = ? AND action = 'completed'",
+                [sample_project_id]
+            )
+            assert sorted(row[0] for row in cursor.fetchall()) == [task1['id'], task2['id']]
+    
+    def test_complete_items_bulk_unknown_item(self, test_db, sample_project_id):
+        """Test that an unknown id rejects the whole batch."""
+        project = create_work_item(
+            project_id=sample_project_id,
+            item_type='project',
+            title='Test Project'
+        )
+        
+        with pytest.raises(ValueError, match="not found"):
+            complete_items_bulk([project['id'], 99999], sample_project_id)
+        
+        assert get_work_items_for_project(sample_project_id)[0]['status'] == 'not_started'
+    
+    def test_work_item_txn_commits_once(self, test_db, sample_project_id):
+        """Test that a session's mutations are all committed on exit."""
+        with work_item_txn(sample_project_id) as session:
+            project = session.create_work_item('project', 'Test Project')
+            task = session.create_work_item('task', 'Test Task', parent_id=project['id'])
+            session.update_work_item(task['id'], status='in_progress')
+            session.complete_item(task['id'])
+        
+        items = get_work_items_for_project(sample_project_id, status_filter=['completed'])
+        assert [item['id'] for item in items] == [task['id']]
+        
+        with get_connection() as conn:
+            cursor = conn.execute(
+                "SELECT action FROM changelog WHERE work_item_id = ? ORDER BY id",
+                [task['id']]
+            )
+            assert [row[0] for row in cursor.fetchall()] == ['created', 'updated', 'completed']
+    
+    def test_work_item_txn_bulk_operations(self, test_db, sample_project_id):
+        """Test bulk create and complete inside one session."""
+        with work_item_txn(sample_project_id) as session:
+            project, task1, task2 = session.create_work_items_bulk([
+                {'key': 'project', 'type': 'project', 'title': 'Test Project'},
+                {'type': 'task', 'title': 'Task 1', 'parent': 'project'},
+                {'type': 'task', 'title': 'Task 2', 'parent': 'project'},
+            ])
+            session.complete_items_bulk([task1['id']])
+        
+        assert [item['id'] for item in get_work_items_for_project(sample_project_id)] == [project['id'], task2['id']]
+        assert get_completion_stats(sample_project_id) == {project['id']: (1, 2)}
+    
+    def test_work_item_txn_rolls_back_on_error(self, test_db, sample_project_id):
+        """Test that an error inside a session discards all of its writes."""
+        with pytest.raises(OrphanNotAllowedError):
+            with work_item_txn(sample_project_id) as session:
+                session.create_work_item('project', 'Test Project')
+                session.create_work_item('phase', 'Orphaned Phase')
+        
+        assert get_work_items_for_project(sample_project_id) == []
+    
     def test_hierarchy_validation_invalid_parent_type(self, test_db, sample_project_id):
         """Test that invalid hierarchy relationships are rejected."""
         # Create a project first
@@ -176,18 +386,19 @@ class TestWorkItemCRUD:
         )
         
         # Try to create a subtask directly under project (invalid)
-        with pytest.raises(ValueError, match="subtask items cannot be children of project"):
+        with pytest.raises(InvalidHierarchyError) as exc_info:
             create_work_item(
                 project_id=sample_project_id,
                 item_type='subtask',
                 title='Invalid Subtask',
                 parent_id=project['id']
             )
+        assert exc_info.value.parent_type == 'project'
     
     def test_hierarchy_validation_orphaned_items(self, test_db, sample_project_id):
         """Test validation of items with no valid parent."""
         # Try to create a phase with no parent (invalid)
-        with pytest.raises(ValueError):
+        with pytest.raises(OrphanNotAllowedError):
             create_work_item(
                 project_id=sample_project_id,
                 item_type='phase',
@@ -265,6 +476,95 @@ class TestWorkPlanRetrieval:
         # Should have completion summaries where all children are completed
         assert hierarchy_with_summaries is not None
         assert 'projects' in hierarchy_with_summaries
+    
+    def test_fused_hierarchy_matches_two_step(self, populated_db, sample_work_items):
+        """Test that the single-pass builder matches build_hierarchy + add_completion_summaries."""
+        incomplete_items = [
+            item for item in sample_work_items
+            if item['status'] in ['not_started', 'in_progress']
+        ]
+        
+        two_step = add_completion_summaries(build_hierarchy(incomplete_items), sample_work_items)
+        fused = build_hierarchy_with_summaries(incomplete_items, sample_work_items)
+        
+        assert fused == two_step
+    
+    def test_completion_stats(self, populated_db, sample_project_id, sample_work_items):
+        """Test that SQL completion stats match counting the items in Python."""
+        stats = get_completion_stats(sample_project_id)
+        
+        # Task 1 has both subtasks completed; Phase 1 has its only task completed
+        assert stats[populated_db[3]] == (2, 2)
+        assert stats[populated_db[2]] == (1, 1)
+        assert stats[populated_db[1]] == (0, 2)
+        
+        incomplete_items = [
+            item for item in sample_work_items
+            if item['status'] in ['not_started', 'in_progress']
+        ]
+        assert (build_hierarchy_with_summaries(incomplete_items, completion_stats=stats)
+                == build_hierarchy_with_summaries(incomplete_items, sample_work_items))
+    
+    def test_completion_stats_follow_moves_and_reopens(self, test_db, sample_project_id):
+        """Test that the child counters behind completion stats track every change."""
+        project, task1, task2, subtask = create_work_items_bulk(sample_project_id, [
+            {'key': 'project', 'type': 'project', 'title': 'Test Project'},
+            {'key': 'task1', 'type': 'task', 'title': 'Task 1', 'parent': 'project'},
+            {'type': 'task', 'title': 'Task 2', 'parent': 'project'},
+            {'type': 'subtask', 'title': 'Subtask', 'parent': 'task1'},
+        ])
+        complete_items_bulk([subtask['id'], task2['id']], sample_project_id)
+        assert get_completion_stats(sample_project_id) == {project['id']: (1, 2), task1['id']: (1, 1)}
+        
+        # Moving a completed subtask updates both the old and the new parent
+        update_work_item(subtask['id'], sample_project_id, parent_id=task2['id'])
+        assert get_completion_stats(sample_project_id) == {project['id']: (1, 2), task2['id']: (1, 1)}
+        
+        # Reopening a task takes it out of its parent's completed count
+        update_work_item(task2['id'], sample_project_id, status='in_progress')
+        assert get_completion_stats(sample_project_id) == {project['id']: (0, 2), task2['id']: (1, 1)}
+    
+    def test_work_items_paged(self, populated_db, sample_project_id):
+        """Test keyset pagination over incomplete items."""
+        expected_ids = sorted(item['id'] for item in get_work_items_for_project(sample_project_id))
+        assert len(expected_ids) == 3
+        
+        page, cursor = get_work_items_page(sample_project_id, limit=2)
+        assert [item['id'] for item in page] == expected_ids[:2]
+        assert cursor == expected_ids[1]
+        
+        page, cursor = get_work_items_page(sample_project_id, after_id=cursor, limit=2)
+        assert [item['id'] for item in page] == expected_ids[2:]
+        assert cursor is None
+        
+        paged_ids = [item['id'] for item in iter_work_items_paged(sample_project_id, page_size=1)]
+        assert paged_ids == expected_ids
+    
+    def test_work_items_paged_exact_multiple(self, populated_db, sample_project_id):
+        """Test that a full last page is followed by one empty page."""
+        expected_ids = sorted(item['id'] for item in get_work_items_for_project(sample_project_id))
+        
+        page, cursor = get_work_items_page(sample_project_id, limit=len(expected_ids))
+        assert [item['id'] for item in page] == expected_ids
+        assert cursor == expected_ids[-1]
+        
+        assert get_work_items_page(sample_project_id, after_id=cursor, limit=len(expected_ids)) == ([], None)
+        assert [item['id'] for item in iter_work_items_paged(sample_project_id, page_size=3)] == expected_ids
+    
+    def test_work_items_paged_empty_project(self, test_db):
+        """Test paging a project with no items."""
+        empty_project_id = get_project_id("empty_project_path")['project_id']
+        
+        assert get_work_items_page(empty_project_id) == ([], None)
+        assert list(iter_work_items_paged(empty_project_id)) == []
+    
+    @pytest.mark.parametrize('limit', [0, -1])
+    def test_work_items_paged_rejects_bad_limit(self, test_db, sample_project_id, limit):
+        """Test that page sizes below 1 are rejected rather than misread."""
+        with pytest.raises(ValueError, match="limit must be at least 1"):
+            get_work_items_page(sample_project_id, limit=limit)
+        with pytest.raises(ValueError, match="limit must be at least 1"):
+            list(iter_work_items_paged(sample_project_id, page_size=limit))
 
 
 class TestSearchFunctionality:
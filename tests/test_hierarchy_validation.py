@@ -10,18 +10,33 @@ work items are maintained correctly:
 """
 
 import pytest
-import sys
-from pathlib import Path
-
-# Add the parent directory to Python path so we can import our modules
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from database import (
     create_work_item, update_work_item, get_connection,
-    build_hierarchy, get_work_items_for_project
+    build_hierarchy, get_work_items_for_project,
+    InvalidHierarchyError, OrphanNotAllowedError,
+    CrossProjectParentError, ParentNotFoundError
 )
 
 
+# Parent/child type combinations the hierarchy rules must reject
+INVALID_PAIRS = [
+    pytest.param('project', 'project', InvalidHierarchyError, id='project->project'),
+    pytest.param('project', 'subtask', InvalidHierarchyError, id='project->subtask'),
+    pytest.param('phase', 'subtask', InvalidHierarchyError, id='phase->subtask'),
+    pytest.param('task', 'phase', InvalidHierarchyError, id='task->phase'),
+    pytest.param('subtask', 'phase', InvalidHierarchyError, id='subtask->phase'),
+    pytest.param('subtask', 'subtask', InvalidHierarchyError, id='subtask->subtask'),
+]
+
+# Item types that must always have a parent
+ORPHAN_TYPES = [
+    pytest.param('phase', OrphanNotAllowedError, id='phase'),
+    pytest.param('task', OrphanNotAllowedError, id='task'),
+    pytest.param('subtask', OrphanNotAllowedError, id='subtask'),
+]
+
+
 class TestValidHierarchyCreation:
     """Test creation of valid hierarchical structures."""
     
@@ -132,166 +147,59 @@ class TestValidHierarchyCreation:
             parent_id=project['id']
         )
         
-        assert phase1['parent_id'] == project['id']
-        assert phase2['parent_id'] == project['id']
-        assert phase3['parent_id'] == project['id']
-        
-        # Verify all phases exist and have correct ordering
-        phases = [phase1, phase2, phase3]
-        for i, phase in enumerate(phases, 1):
-            assert phase['title'] == f'Phase {i}'
-            assert phase['order_index'] == i * 10.0  # Should auto-increment by 10
+        # Verify all phases share the parent and order_index auto-increments by 10
+        actual = [(p['title'], p['order_index'], p['parent_id']) for p in (phase1, phase2, phase3)]
+        expected = [
+            ('Phase 1', 10.0, project['id']),
+            ('Phase 2', 20.0, project['id']),
+            ('Phase 3', 30.0, project['id']),
+        ]
+        assert actual == expected
 
 
 class TestHierarchyConstraintViolations:
     """Test that invalid hierarchy relationships are properly rejected."""
     
-    def test_subtask_cannot_have_children(self, test_db, sample_project_id):
-        """Test that subtasks cannot have children (deepest level)."""
-        # Create valid hierarchy to subtask level
-        project = create_work_item(
-            project_id=sample_project_id,
-            item_type='project',
-            title='Test Project'
-        )
-        
-        task = create_work_item(
-            project_id=sample_project_id,
-            item_type='task',
-            title='Test Task',
-            parent_id=project['id']
-        )
-        
-        subtask = create_work_item(
-            project_id=sample_project_id,
-            item_type='subtask',
-            title='Test Subtask',
-            parent_id=task['id']
-        )
-        
-        # Try to create any item under subtask (should fail)
-        with pytest.raises(ValueError, match="subtask items cannot be children of subtask"):
-            create_work_item(
-                project_id=sample_project_id,
-                item_type='subtask',
-                title='Invalid Child',
-                parent_id=subtask['id']
-            )
-    
-    def test_invalid_parent_child_combinations(self, test_db, sample_project_id):
-        """Test various invalid parent-child type combinations."""
-        # Create base items for testing
-        project = create_work_item(
-            project_id=sample_project_id,
-            item_type='project',
-            title='Test Project'
-        )
-        
-        phase = create_work_item(
-            project_id=sample_project_id,
-            item_type='phase',
-            title='Test Phase',
-            parent_id=project['id']
-        )
-        
-        task = create_work_item(
-            project_id=sample_project_id,
-            item_type='task',
-            title='Test Task',
-            parent_id=phase['id']
-        )
-        
-        # Test invalid combinations
-        
-        # 1. Subtask directly under project (should fail)
-        with pytest.raises(ValueError, match="subtask items cannot be children of project"):
-            create_work_item(
-                project_id=sample_project_id,
-                item_type='subtask',
-                title='Invalid Subtask',
-                parent_id=project['id']
-            )
-        
-        # 2. Subtask directly under phase (should fail)
-        with pytest.raises(ValueError, match="subtask items cannot be children of phase"):
-            create_work_item(
-                project_id=sample_project_id,
-                item_type='subtask',
-                title='Invalid Subtask',
-                parent_id=phase['id']
-            )
-        
-        # 3. Phase under task (should fail - phases are higher level)
-        with pytest.raises(ValueError, match="phase items cannot be children of task"):
-            create_work_item(
-                project_id=sample_project_id,
-                item_type='phase',
-                title='Invalid Phase',
-                parent_id=task['id']
-            )
-        
-        # 4. Phase under subtask (should fail)
-        subtask = create_work_item(
-            project_id=sample_project_id,
-            item_type='subtask',
-            title='Test Subtask',
-            parent_id=task['id']
-        )
-        
-        with pytest.raises(ValueError, match="phase items cannot be children of subtask"):
-            create_work_item(
+    @pytest.fixture
+    def parent_chain(self, test_db, sample_project_id):
+        """Create one item of every type (project -> phase -> task -> subtask), keyed by type."""
+        chain = {}
+        parent_id = None
+        for item_type in ('project', 'phase', 'task', 'subtask'):
+            chain[item_type] = create_work_item(
                 project_id=sample_project_id,
-                item_type='phase',
-                title='Invalid Phase',
-                parent_id=subtask['id']
+                item_type=item_type,
+                title=f'Test {item_type.capitalize()}',
+                parent_id=parent_id
             )
+            parent_id = chain[item_type]['id']
+        return chain
     
-    def test_project_cannot_have_parent(self, test_db, sample_project_id):
-        """Test that projects cannot have parents (must be root level)."""
-        # Create a project first
-        project1 = create_work_item(
-            project_id=sample_project_id,
-            item_type='project',
-            title='Test Project 1'
-        )
-        
-        # Try to create another project with the first as parent (should fail)
-        with pytest.raises(ValueError, match="project items cannot be children of project"):
+    @pytest.mark.parametrize('parent_type, child_type, error', INVALID_PAIRS)
+    def test_invalid_parent_child_combinations(self, parent_chain, sample_project_id,
+                                               parent_type, child_type, error):
+        """Test that invalid parent-child type combinations are rejected."""
+        with pytest.raises(error) as exc_info:
             create_work_item(
                 project_id=sample_project_id,
-                item_type='project',
-                title='Invalid Child Project',
-                parent_id=project1['id']
+                item_type=child_type,
+                title=f'Invalid {child_type.capitalize()}',
+                parent_id=parent_chain[parent_type]['id']
             )
+        assert exc_info.value.item_type == child_type
+        assert exc_info.value.parent_type == parent_type
     
-    def test_orphaned_items_validation(self, test_db, sample_project_id):
-        """Test that items requiring parents are validated."""
-        # Test phase without parent
-        with pytest.raises(ValueError, match="phase items cannot be top-level"):
-            create_work_item(
-                project_id=sample_project_id,
-                item_type='phase',
-                title='Orphaned Phase'
-                # No parent_id provided
-            )
-        
-        # Test task without parent
-        with pytest.raises(ValueError, match="task items cannot be top-level"):
-            create_work_item(
-                project_id=sample_project_id,
-                item_type='task',
-                title='Orphaned Task'
-                # No parent_id provided
-            )
-        
-        # Test subtask without parent
-        with pytest.raises(ValueError, match="subtask items cannot be top-level"):
+    @pytest.mark.parametrize('item_type, error', ORPHAN_TYPES)
+    def test_orphaned_items_validation(self, test_db, sample_project_id, item_type, error):
+        """Test that items requiring parents cannot be created top-level."""
+        with pytest.raises(error) as exc_info:
             create_work_item(
                 project_id=sample_project_id,
-                item_type='subtask',
-                title='Orphaned Subtask'
+                item_type=item_type,
+                title=f'Orphaned {item_type.capitalize()}'
                 # No parent_id provided
             )
+        assert exc_info.value.item_type == item_type
 
 
 class TestCircularReferencesPrevention:
@@ -314,12 +222,14 @@ class TestCircularReferencesPrevention:
         )
         
         # Try to make task its own parent
-        with pytest.raises(ValueError, match="Cannot move task under task"):
+        with pytest.raises(InvalidHierarchyError) as exc_info:
             update_work_item(
                 item_id=task['id'],
                 project_id=sample_project_id,
                 parent_id=task['id']
             )
+        assert exc_info.value.item_type == 'task'
+        assert exc_info.value.parent_type == 'task'
     
     def test_cannot_create_circular_reference_chain(self, test_db, sample_project_id):
         """Test that circular reference chains are prevented."""
@@ -345,20 +255,24 @@ class TestCircularReferencesPrevention:
         )
         
         # Try to make project the child of task (would create cycle)
-        with pytest.raises(ValueError, match="Cannot move project under task"):
+        with pytest.raises(InvalidHierarchyError) as exc_info:
             update_work_item(
                 item_id=project['id'],
                 project_id=sample_project_id,
                 parent_id=task['id']
             )
+        assert exc_info.value.item_type == 'project'
+        assert exc_info.value.parent_type == 'task'
         
         # Try to make phase the child of task (would create cycle)
-        with pytest.raises(ValueError, match="Cannot move phase under task"):
+        with pytest.raises(InvalidHierarchyError) as exc_info:
             update_work_item(
                 item_id=phase['id'],
                 project_id=sample_project_id,
                 parent_id=task['id']
             )
+        assert exc_info.value.item_type == 'phase'
+        assert exc_info.value.parent_type == 'task'
     
     def test_deep_hierarchy_depth_limit(self, test_db, sample_project_id):
         """Test that hierarchy depth is limited to prevent excessive nesting."""
@@ -394,46 +308,55 @@ class TestCircularReferencesPrevention:
         assert subtask['parent_id'] == task['id']
         
         # Verify we can't go deeper (subtasks can't have children)
-        with pytest.raises(ValueError, match="subtask items cannot be children of subtask"):
+        with pytest.raises(InvalidHierarchyError) as exc_info:
             create_work_item(
                 project_id=sample_project_id,
                 item_type='subtask',
                 title='Too Deep Subtask',
                 parent_id=subtask['id']
             )
+        assert exc_info.value.item_type == 'subtask'
+        assert exc_info.value.parent_type == 'subtask'
 
 
 class TestOrphanedItemHandling:
     """Test handling of orphaned items and hierarchy integrity."""
     
-    def test_orphaned_items_in_hierarchy_building(self, test_db, sample_project_id):
-        """Test that orphaned items are handled properly in hierarchy building."""
-        # Create valid hierarchy
-        project = create_work_item(
+    @pytest.fixture(scope='class', autouse=True)
+    @classmethod
+    def base_project(cls, class_db, sample_project_id):
+        """Create the project shared by every test in this class."""
+        cls.project = create_work_item(
             project_id=sample_project_id,
             item_type='project',
             title='Test Project'
         )
-        
+        yield
+    
+    def test_orphaned_items_in_hierarchy_building(self, test_db, sample_project_id):
+        """Test that orphaned items are handled properly in hierarchy building."""
+        # Create valid hierarchy under the shared project
         task = create_work_item(
             project_id=sample_project_id,
             item_type='task',
             title='Valid Task',
-            parent_id=project['id']
+            parent_id=self.project['id']
         )
         
-        # Manually insert an orphaned item (parent_id points to non-existent item)
+        # Manually insert an orphaned item (parent_id 99999 doesn't exist).
+        # All values are test constants, so they are inlined into one script.
         with get_connection() as conn:
-            conn.execute('''
+            conn.executescript(f'''
+                BEGIN;
                 INSERT INTO work_items (
                     project_id, type, title, description, status, parent_id, 
                     order_index, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-            ''', [
-                sample_project_id, 'task', 'Orphaned Task', 'Has invalid parent', 
-                'not_started', 99999, 1.0  # parent_id 99999 doesn't exist
-            ])
-            conn.commit()
+                ) VALUES (
+                    '{sample_project_id}', 'task', 'Orphaned Task', 'Has invalid parent',
+                    'not_started', 99999, 1.0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                );
+                COMMIT;
+            ''')
         
         # Get all items and build hierarchy
         all_items = get_work_items_for_project(sample_project_id)
@@ -450,13 +373,6 @@ class TestOrphanedItemHandling:
     
     def test_parent_belongs_to_same_project(self, test_db, sample_project_id):
         """Test that parent items must belong to the same project."""
-        # Create project in first project_id
-        project1 = create_work_item(
-            project_id=sample_project_id,
-            item_type='project',
-            title='Project 1'
-        )
-        
         # Create project in second project_id
         from project_id import get_project_id
         other_project_id = get_project_id("different_project_path")['project_id']
@@ -466,25 +382,27 @@ class TestOrphanedItemHandling:
             title='Project 2'
         )
         
-        # Try to create task in project1 with parent from project2 (should fail)
-        with pytest.raises(ValueError, match="Parent item belongs to different project"):
+        # Try to create task in the shared project with parent from project2 (should fail)
+        with pytest.raises(CrossProjectParentError) as exc_info:
             create_work_item(
                 project_id=sample_project_id,
                 item_type='task',
                 title='Cross-project task',
                 parent_id=project2['id']  # Parent from different project
             )
+        assert exc_info.value.parent_project_id == other_project_id
     
     def test_valid_parent_exists(self, test_db, sample_project_id):
         """Test that parent_id must reference an existing item."""
         # Try to create item with non-existent parent_id
-        with pytest.raises(ValueError, match="Parent item with ID .* does not exist"):
+        with pytest.raises(ParentNotFoundError) as exc_info:
             create_work_item(
                 project_id=sample_project_id,
                 item_type='task',
                 title='Task with bad parent',
                 parent_id=99999  # Non-existent ID
             )
+        assert exc_info.value.parent_id == 99999
 
 
 class TestHierarchyUpdateValidation:
@@ -553,7 +471,7 @@ class TestHierarchyUpdateValidation:
         )
         
         # Try to make project a child of subtask (invalid hierarchy)
-        with pytest.raises(ValueError, match="Cannot move project under subtask"):
+        with pytest.raises(InvalidHierarchyError) as exc_info:
             update_work_item(
                 item_id=project['id'],
                 project_id=sample_project_id,
@@ -0,0 +1 @@
+"""Token efficiency comparisons between traditional context and the MCP rolling work plan."""
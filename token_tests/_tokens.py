@@ -0,0 +1,39 @@
+"""
+Token counting shared by the token comparison scripts.
+
+Counts use tiktoken's cl100k_base encoding when it is installed, otherwise
+~4 chars per token for English. Text is encoded as ordinary text, so special
+token markers in a document count like any other characters.
+"""
+
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def _encoder():
+    """
+    tiktoken's cl100k_base encoding, imported and loaded on first use.
+    tiktoken is optional: without it this returns None and token counts are estimated.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+@lru_cache(maxsize=16)
+def estimate_tokens(text):
+    """Token count for one text. Cached for the repeated context documents."""
+    encoding = _encoder()
+    if encoding is not None:
+        return len(encoding.encode_ordinary(text))
+    return len(text) // 4
+
+def count_tokens_batch(texts):
+    """
+    Token counts for several texts. With tiktoken they are encoded in one
+    encode_ordinary_batch call, which spreads them over threads outside the GIL.
+    """
+    encoding = _encoder()
+    if encoding is not None:
+        return [len(tokens) for tokens in encoding.encode_ordinary_batch(texts)]
+    return [estimate_tokens(text) for text in texts]
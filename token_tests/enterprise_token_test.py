@@ -11,927 +11,240 @@ Traditional: Agent gets EVERYTHING (current files, history, notes, docs)
 MCP: Agent gets focused rolling work plan (incomplete items only)
 """
 
-import json
+import re
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import (init_database, create_work_item, complete_item, 
-                      get_work_items_for_project, get_all_work_items_for_project, 
-                      build_hierarchy, add_completion_summaries)
-from project_id import get_project_id
-
-def estimate_tokens(text):
-    """Estimate tokens (~4 chars per token for English)"""
-    return len(text) // 4
-
-def create_massive_traditional_context():
-    """
-    Simulate a real enterprise project with extensive documentation
-    that an AI agent would typically receive as context
-    """
-    
-    # Main project tracking file (realistic size for active project)
-    project_plan = """# Enterprise CRM System - Q3 2024 Development Plan
-
-## Executive Summary
-Building next-generation CRM system to replace legacy Salesforce implementation.
-Budget: $2.4M | Timeline: 12 months | Team: 15 developers | Status: Month 6/12
-
-## Phase 1: Data Migration and Core Infrastructure [COMPLETED ✅]
-
-### Epic 1.1: Legacy Data Analysis [COMPLETED ✅]
-#### Story 1.1.1: Data Audit and Mapping [COMPLETED ✅] 
-- [x] Audit existing Salesforce data structure (completed 2024-01-15 - 24 hours)
-- [x] Map legacy fields to new schema (completed 2024-01-18 - 32 hours)
-- [x] Identify data quality issues (completed 2024-01-22 - 16 hours)
-- [x] Create data cleaning scripts (completed 2024-01-25 - 40 hours) 
-- [x] Validate data integrity constraints (completed 2024-01-29 - 20 hours)
-- [x] Document migration strategy (completed 2024-02-01 - 12 hours)
-- [x] Stakeholder review and approval (completed 2024-02-05 - 8 hours)
-
-#### Story 1.1.2: Migration Tooling [COMPLETED ✅]
-- [x] Build ETL pipeline architecture (completed 2024-02-08 - 60 hours)
-- [x] Implement data transformation logic (completed 2024-02-15 - 80 hours) 
-- [x] Create rollback procedures (completed 2024-02-18 - 24 hours)
-- [x] Performance testing with sample data (completed 2024-02-22 - 32 hours)
-- [x] Security audit for data handling (completed 2024-02-25 - 16 hours)
-- [x] Disaster recovery procedures (completed 2024-02-28 - 20 hours)
-
-### Epic 1.2: Core Backend Services [COMPLETED ✅]
-#### Story 1.2.1: Authentication and Authorization [COMPLETED ✅]
-- [x] OAuth2 implementation with Azure AD (completed 2024-03-01 - 40 hours)
-- [x] Role-based permission system (completed 2024-03-05 - 48 hours)
-- [x] Multi-factor authentication (completed 2024-03-08 - 32 hours)
-- [x] Session management and security (completed 2024-03-12 - 24 hours)
-- [x] API rate limiting and protection (completed 2024-03-15 - 20 hours)
-- [x] Audit logging for compliance (completed 2024-03-18 - 28 hours)
-
-#### Story 1.2.2: Customer Data Management [COMPLETED ✅]
-- [x] Customer CRUD API endpoints (completed 2024-03-20 - 56 hours)
-- [x] Advanced search and filtering (completed 2024-03-25 - 44 hours)
-- [x] Duplicate detection and merging (completed 2024-03-28 - 36 hours)  
-- [x] Data validation and enrichment (completed 2024-04-01 - 32 hours)
-- [x] Import/export functionality (completed 2024-04-05 - 40 hours)
-- [x] Integration with external data sources (completed 2024-04-10 - 48 hours)
-
-#### Story 1.2.3: Opportunity Management [COMPLETED ✅] 
-- [x] Lead capture and qualification (completed 2024-04-12 - 42 hours)
-- [x] Opportunity pipeline management (completed 2024-04-18 - 52 hours)
-- [x] Sales forecasting algorithms (completed 2024-04-22 - 60 hours)
-- [x] Territory and quota management (completed 2024-04-26 - 44 hours)
-- [x] Commission calculation engine (completed 2024-05-01 - 56 hours)
-- [x] Workflow automation triggers (completed 2024-05-05 - 36 hours)
-
-## Phase 2: User Interface and Experience [IN PROGRESS 🔄]
-
-### Epic 2.1: Core UI Framework [PARTIALLY COMPLETED ⚠️]
-#### Story 2.1.1: Design System Implementation [COMPLETED ✅]
-- [x] Design token system setup (completed 2024-05-08 - 32 hours)
-- [x] Component library foundation (completed 2024-05-12 - 48 hours)
-- [x] Responsive grid system (completed 2024-05-15 - 24 hours)
-- [x] Typography and color systems (completed 2024-05-18 - 20 hours)
-- [x] Icon library and asset management (completed 2024-05-22 - 28 hours)
-- [x] Accessibility compliance framework (completed 2024-05-25 - 36 hours)
-
-#### Story 2.1.2: Navigation and Layout [IN PROGRESS 🔄]
-- [x] Main navigation structure (completed 2024-05-28 - 40 hours)
-- [x] Sidebar and menu components (completed 2024-06-01 - 32 hours)
-- [x] Breadcrumb navigation system (completed 2024-06-05 - 20 hours)
-- [ ] Advanced search interface (IN PROGRESS - 60% complete, 24 hours remaining)
-- [ ] User dashboard customization (NOT STARTED - estimated 44 hours)
-- [ ] Notification center implementation (NOT STARTED - estimated 36 hours)
-- [ ] Help and documentation integration (NOT STARTED - estimated 28 hours)
-
-### Epic 2.2: Customer Management Interface [PARTIALLY COMPLETED ⚠️]
-#### Story 2.2.1: Customer List and Search [PARTIALLY COMPLETED ⚠️] 
-- [x] Customer listing with pagination (completed 2024-06-08 - 36 hours)
-- [x] Basic search functionality (completed 2024-06-12 - 28 hours)
-- [x] Column customization and sorting (completed 2024-06-15 - 32 hours)
-- [ ] Advanced filtering options (IN PROGRESS - 40% complete, 36 hours remaining)
-- [ ] Bulk operations interface (NOT STARTED - estimated 40 hours)
-- [ ] Export functionality UI (NOT STARTED - estimated 24 hours)
-- [ ] Saved search and views (NOT STARTED - estimated 32 hours)
-
-#### Story 2.2.2: Customer Detail Views [IN PROGRESS 🔄]
-- [x] Customer profile layout (completed 2024-06-18 - 44 hours)
-- [x] Contact information management (completed 2024-06-22 - 32 hours)
-- [ ] Activity timeline component (IN PROGRESS - 70% complete, 18 hours remaining)
-- [ ] Document and attachment management (NOT STARTED - estimated 36 hours)
-- [ ] Communication history tracking (NOT STARTED - estimated 40 hours)
-- [ ] Related opportunities display (NOT STARTED - estimated 28 hours)
-- [ ] Customer segmentation UI (NOT STARTED - estimated 32 hours)
-
-### Epic 2.3: Sales Pipeline Interface [NOT STARTED ❌]
-#### Story 2.3.1: Pipeline Visualization [NOT STARTED ❌]
-- [ ] Kanban board for opportunities (NOT STARTED - estimated 56 hours)
-- [ ] Pipeline stage management (NOT STARTED - estimated 40 hours)
-- [ ] Drag-and-drop functionality (NOT STARTED - estimated 44 hours)
-- [ ] Deal value and probability tracking (NOT STARTED - estimated 32 hours)
-- [ ] Sales velocity analytics (NOT STARTED - estimated 48 hours)
-- [ ] Team performance dashboard (NOT STARTED - estimated 52 hours)
-
-#### Story 2.3.2: Opportunity Management [NOT STARTED ❌]
-- [ ] Opportunity creation workflow (NOT STARTED - estimated 48 hours)
-- [ ] Product and pricing configuration (NOT STARTED - estimated 60 hours)
-- [ ] Proposal generation system (NOT STARTED - estimated 72 hours)
-- [ ] Contract management interface (NOT STARTED - estimated 56 hours)
-- [ ] E-signature integration (NOT STARTED - estimated 40 hours)
-- [ ] Revenue forecasting tools (NOT STARTED - estimated 64 hours)
-
-## Phase 3: Advanced Features and Integrations [NOT STARTED ❌]
-
-### Epic 3.1: Marketing Automation [NOT STARTED ❌]
-#### Story 3.1.1: Campaign Management [NOT STARTED ❌]
-- [ ] Campaign creation and management (NOT STARTED - estimated 80 hours)
-- [ ] Email template editor (NOT STARTED - estimated 56 hours)
-- [ ] Lead scoring algorithms (NOT STARTED - estimated 68 hours)
-- [ ] A/B testing framework (NOT STARTED - estimated 48 hours)
-- [ ] Marketing analytics dashboard (NOT STARTED - estimated 60 hours)
-- [ ] Social media integration (NOT STARTED - estimated 52 hours)
-
-### Epic 3.2: Reporting and Analytics [NOT STARTED ❌]  
-#### Story 3.2.1: Custom Report Builder [NOT STARTED ❌]
-- [ ] Drag-and-drop report designer (NOT STARTED - estimated 96 hours)
-- [ ] Data visualization components (NOT STARTED - estimated 72 hours)
-- [ ] Scheduled report delivery (NOT STARTED - estimated 40 hours)
-- [ ] Real-time dashboard updates (NOT STARTED - estimated 56 hours)
-- [ ] Executive summary generation (NOT STARTED - estimated 44 hours)
-- [ ] Compliance reporting tools (NOT STARTED - estimated 60 hours)
-
-### Epic 3.3: Third-party Integrations [NOT STARTED ❌]
-#### Story 3.3.1: Communication Platforms [NOT STARTED ❌]
-- [ ] Microsoft Teams integration (NOT STARTED - estimated 48 hours)
-- [ ] Slack notification system (NOT STARTED - estimated 36 hours)
-- [ ] Email platform synchronization (NOT STARTED - estimated 52 hours)
-- [ ] Calendar integration (Outlook/Google) (NOT STARTED - estimated 44 hours)
-- [ ] Video conferencing integration (NOT STARTED - estimated 40 hours)
-- [ ] SMS and phone system integration (NOT STARTED - estimated 56 hours)
-
-## Phase 4: Testing, Security, and Deployment [NOT STARTED ❌]
-
-### Epic 4.1: Quality Assurance [NOT STARTED ❌]
-- [ ] Automated testing suite development (NOT STARTED - estimated 120 hours)
-- [ ] Performance testing and optimization (NOT STARTED - estimated 80 hours)
-- [ ] Security penetration testing (NOT STARTED - estimated 60 hours)
-- [ ] User acceptance testing coordination (NOT STARTED - estimated 40 hours)
-- [ ] Load testing for enterprise scale (NOT STARTED - estimated 48 hours)
-- [ ] Accessibility compliance validation (NOT STARTED - estimated 36 hours)
-
-### Epic 4.2: Production Deployment [NOT STARTED ❌]
-- [ ] Production infrastructure setup (NOT STARTED - estimated 64 hours)
-- [ ] CI/CD pipeline implementation (NOT STARTED - estimated 48 hours)
-- [ ] Monitoring and alerting systems (NOT STARTED - estimated 52 hours)
-- [ ] Backup and disaster recovery (NOT STARTED - estimated 40 hours)
-- [ ] Staff training and documentation (NOT STARTED - estimated 80 hours)
-- [ ] Go-live support and stabilization (NOT STARTED - estimated 120 hours)
-
-## Current Sprint Status (Sprint 24 - June 18-29, 2024)
-
-### Sprint Goals
-1. Complete advanced search interface implementation
-2. Finish activity timeline component
-3. Begin work on advanced filtering options
-4. Start customer segmentation UI planning
-
-### In Progress This Sprint
-- **Advanced search interface**: 60% complete (John, Sarah)
-- **Activity timeline component**: 70% complete (Mike, Lisa)  
-- **Advanced filtering options**: 40% complete (David)
-- **User dashboard customization**: Blocked pending UX review (Emma)
-
-### Completed This Sprint
-- Customer profile layout refinements
-- Contact information management improvements  
-- Performance optimizations for customer listing
-- Bug fixes for column customization
-
-### Sprint Blockers
-- UX review delayed for dashboard customization (waiting on design team)
-- Advanced search backend API needs optimization (performance issues)
-- Timeline component needs real-time update capability (architecture decision needed)
-
-## Risk Assessment and Mitigation
-
-### HIGH RISK Items
-1. **Backend API Performance**: Customer search queries timing out with large datasets
-   - Mitigation: Database indexing optimization scheduled for next sprint
-2. **Timeline Component Complexity**: Real-time updates causing browser performance issues
-   - Mitigation: Considering virtual scrolling implementation
-3. **Advanced Filtering Architecture**: Current approach may not scale to enterprise data volumes
-   - Mitigation: Architecture review scheduled with senior engineers
-
-### MEDIUM RISK Items  
-1. **Third-party Integration Delays**: External vendor APIs not meeting performance requirements
-2. **User Training Requirements**: More extensive than originally estimated
-3. **Data Migration Window**: Limited maintenance window for production cutover
-
-### Budget and Resource Status
-- **Budget Used**: $1.2M of $2.4M (50% - on track)
-- **Timeline**: Month 6 of 12 (slightly behind on UI development)
-- **Resource Utilization**: 15 developers, 2 designers, 1 architect, 3 testers
-
-## Success Metrics and KPIs
-- **User Adoption Rate**: Target 80% within 3 months of launch
-- **System Performance**: <2 second response time for all operations
-- **Data Migration Accuracy**: 99.9% data integrity maintained
-- **User Satisfaction**: >4.5/5 rating in post-launch surveys
-- **ROI Timeline**: Break-even projected at 18 months post-launch
-
-## Decision Log and Technical Debt
-### Recent Architecture Decisions
-- Chose React over Vue.js for frontend framework (performance requirements)
-- Implemented microservices architecture (scalability and team distribution)
-- Selected PostgreSQL over MongoDB (data consistency requirements) 
-- Adopted TypeScript for frontend development (code quality and maintainability)
-
-### Known Technical Debt
-- Legacy API endpoints still in use during migration period
-- Some frontend components not following design system standards
-- Test coverage below 80% target in several modules
-- Documentation lagging behind implementation in some areas
-"""
-
-    # Detailed technical documentation
-    technical_docs = """# Technical Architecture Documentation - CRM System
-
-## System Architecture Overview
-
-### High-Level Architecture
-- **Frontend**: React 18 + TypeScript + Redux Toolkit
-- **Backend**: Node.js + Express.js + TypeScript  
-- **Database**: PostgreSQL 14 with read replicas
-- **Cache**: Redis for session and query caching
-- **Message Queue**: Apache Kafka for event streaming
-- **File Storage**: AWS S3 with CloudFront CDN
-- **Authentication**: OAuth2 with Azure Active Directory
-- **Monitoring**: DataDog + New Relic + ELK Stack
-
-### Database Schema Design
-
-#### Core Entities
-```sql
--- Customer entity (5M+ records expected)
-CREATE TABLE customers (
-    id BIGSERIAL PRIMARY KEY,
-    external_id VARCHAR(255) UNIQUE, -- Legacy Salesforce ID
-    company_name VARCHAR(500) NOT NULL,
-    industry VARCHAR(100),
-    employee_count INTEGER,
-    annual_revenue DECIMAL(15,2),
-    website VARCHAR(255),
-    phone VARCHAR(50),
-    email VARCHAR(255),
-    billing_address_id BIGINT REFERENCES addresses(id),
-    shipping_address_id BIGINT REFERENCES addresses(id),
-    assigned_user_id BIGINT REFERENCES users(id),
-    territory_id BIGINT REFERENCES territories(id),
-    customer_status VARCHAR(50) DEFAULT 'active',
-    lifecycle_stage VARCHAR(50) DEFAULT 'prospect',
-    lead_source VARCHAR(100),
-    tags JSONB,
-    custom_fields JSONB,
-    created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW(),
-    created_by BIGINT REFERENCES users(id),
-    updated_by BIGINT REFERENCES users(id)
-);
-
--- Opportunities entity (2M+ records expected)
-CREATE TABLE opportunities (
-    id BIGSERIAL PRIMARY KEY,
-    external_id VARCHAR(255) UNIQUE,
-    customer_id BIGINT NOT NULL REFERENCES customers(id),
-    opportunity_name VARCHAR(500) NOT NULL,
-    description TEXT,
-    amount DECIMAL(15,2),
-    currency VARCHAR(3) DEFAULT 'USD',
-    probability INTEGER CHECK (probability >= 0 AND probability <= 100),
-    stage VARCHAR(100) NOT NULL,
-    pipeline_id BIGINT REFERENCES pipelines(id),
-    close_date DATE,
-    actual_close_date DATE,
-    lead_source VARCHAR(100),
-    campaign_id BIGINT REFERENCES campaigns(id),
-    assigned_user_id BIGINT NOT NULL REFERENCES users(id),
-    territory_id BIGINT REFERENCES territories(id),
-    competitor_analysis JSONB,
-    next_steps TEXT,
-    custom_fields JSONB,
-    created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW(),
-    created_by BIGINT REFERENCES users(id),
-    updated_by BIGINT REFERENCES users(id)
-);
-
--- Activities entity (50M+ records expected - high volume)
-CREATE TABLE activities (
-    id BIGSERIAL PRIMARY KEY,
-    activity_type VARCHAR(50) NOT NULL, -- email, call, meeting, note, task
-    subject VARCHAR(500) NOT NULL,
-    description TEXT,
-    activity_date TIMESTAMP NOT NULL,
-    duration_minutes INTEGER,
-    customer_id BIGINT REFERENCES customers(id),
-    opportunity_id BIGINT REFERENCES opportunities(id),
-    assigned_user_id BIGINT NOT NULL REFERENCES users(id),
-    contact_id BIGINT REFERENCES contacts(id),
-    activity_status VARCHAR(50) DEFAULT 'completed',
-    priority VARCHAR(20) DEFAULT 'medium',
-    outcome VARCHAR(100),
-    external_meeting_id VARCHAR(255), -- Teams/Zoom meeting ID
-    email_thread_id VARCHAR(255),
-    attachments JSONB,
-    custom_fields JSONB,
-    created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW(),
-    created_by BIGINT REFERENCES users(id)
-);
-```
-
-#### Performance Indexes
-```sql
--- High-performance indexes for common queries
-CREATE INDEX CONCURRENTLY idx_customers_company_name_gin ON customers USING gin(to_tsvector('english', company_name));
-CREATE INDEX CONCURRENTLY idx_customers_assigned_user ON customers(assigned_user_id) WHERE customer_status = 'active';
-CREATE INDEX CONCURRENTLY idx_customers_territory_industry ON customers(territory_id, industry);
-
-CREATE INDEX CONCURRENTLY idx_opportunities_customer_stage ON opportunities(customer_id, stage);
-CREATE INDEX CONCURRENTLY idx_opportunities_assigned_user_close_date ON opportunities(assigned_user_id, close_date);
-CREATE INDEX CONCURRENTLY idx_opportunities_amount_stage ON opportunities(amount DESC, stage) WHERE amount > 0;
-
-CREATE INDEX CONCURRENTLY idx_activities_customer_date ON activities(customer_id, activity_date DESC);
-CREATE INDEX CONCURRENTLY idx_activities_user_date_type ON activities(assigned_user_id, activity_date DESC, activity_type);
-CREATE INDEX CONCURRENTLY idx_activities_opportunity_date ON activities(opportunity_id, activity_date DESC);
-```
-
-### API Design Patterns
-
-#### RESTful Endpoint Structure
-```typescript
-// Customer Management API
-GET    /api/v1/customers                    // List customers with filtering
-POST   /api/v1/customers                    // Create new customer  
-GET    /api/v1/customers/{id}               // Get customer details
-PUT    /api/v1/customers/{id}               // Update customer
-DELETE /api/v1/customers/{id}               // Soft delete customer
-
-// Advanced search and filtering
-POST   /api/v1/customers/search             // Complex search queries
-GET    /api/v1/customers/export             // Export customer data
-POST   /api/v1/customers/bulk-update        // Bulk operations
-
-// Opportunity Management API  
-GET    /api/v1/opportunities                // List opportunities
-POST   /api/v1/opportunities                // Create opportunity
-GET    /api/v1/opportunities/{id}           // Get opportunity details
-PUT    /api/v1/opportunities/{id}           // Update opportunity
-POST   /api/v1/opportunities/{id}/advance   // Move to next stage
-POST   /api/v1/opportunities/{id}/close-won // Mark as closed won
-POST   /api/v1/opportunities/{id}/close-lost // Mark as closed lost
-
-// Pipeline and forecasting
-GET    /api/v1/pipelines                    // Get pipeline definitions
-GET    /api/v1/pipelines/{id}/forecast      // Pipeline forecast data
-GET    /api/v1/users/{id}/pipeline          // User's pipeline view
-```
-
-#### Request/Response Patterns
-```typescript
-// Standardized API response format
-interface ApiResponse<T> {
-    success: boolean;
-    data: T;
-    metadata?: {
-        page?: number;
-        pageSize?: number;
-        totalCount?: number;
-        totalPages?: number;
-    };
-    errors?: Array<{
-        field?: string;
-        message: string;
-        code: string;
-    }>;
-    timestamp: string;
-    requestId: string;
-}
-
-// Customer search request example
-interface CustomerSearchRequest {
-    filters: {
-        companyName?: string;
-        industry?: string[];
-        revenueRange?: {
-            min?: number;
-            max?: number;
-        };
-        territory?: string[];
-        assignedUser?: string[];
-        customFields?: Record<string, any>;
-    };
-    sort: Array<{
-        field: string;
-        direction: 'asc' | 'desc';
-    }>;
-    pagination: {
-        page: number;
-        pageSize: number;
-    };
-    includeFacets?: boolean;
-}
-```
-
-### Frontend Architecture
-
-#### Component Structure
-```typescript
-// Feature-based folder structure
-src/
-  components/
-    common/               // Shared UI components
-      Button/
-      Input/
-      Modal/
-      DataTable/
-      SearchInput/
-    customers/            // Customer-specific components
-      CustomerList/
-      CustomerDetail/
-      CustomerForm/
-      CustomerSearch/
-    opportunities/        // Opportunity components
-      OpportunityList/
-      OpportunityDetail/
-      PipelineView/
-      ForecastView/
-    
-  features/              // Feature modules
-    customers/
-      api/               // API calls for customer operations
-      hooks/             // Custom React hooks
-      types/             // TypeScript type definitions
-      utils/             // Helper functions
-    
-  store/                 // Redux state management
-    slices/
-      customersSlice.ts
-      opportunitiesSlice.ts
-      authSlice.ts
-    api/                 // RTK Query API definitions
-      customersApi.ts
-      opportunitiesApi.ts
-```
-
-#### State Management Patterns
-```typescript
-// Redux Toolkit Query for server state
-export const customersApi = createApi({
-    reducerPath: 'customersApi',
-    baseQuery: fetchBaseQuery({
-        baseUrl: '/api/v1/customers',
-        prepareHeaders: (headers, { getState }) => {
-            headers.set('authorization', `Bearer ${getToken(getState())}`);
-            return headers;
-        },
-    }),
-    tagTypes: ['Customer', 'CustomerList'],
-    endpoints: (builder) => ({
-        getCustomers: builder.query<CustomerListResponse, CustomerSearchRequest>({
-            query: (searchRequest) => ({
-                url: '/search',
-                method: 'POST',
-                body: searchRequest,
-            }),
-            providesTags: (result) => [
-                'CustomerList',
-                ...(result?.data.map(({ id }) => ({ type: 'Customer' as const, id })) ?? []),
-            ],
-        }),
-        getCustomer: builder.query<Customer, string>({
-            query: (id) => `/${id}`,
-            providesTags: (result, error, id) => [{ type: 'Customer', id }],
-        }),
-        updateCustomer: builder.mutation<Customer, { id: string; data: Partial<Customer> }>({
-            query: ({ id, data }) => ({
-                url: `/${id}`,
-                method: 'PUT',
-                body: data,
-            }),
-            invalidatesTags: (result, error, { id }) => [
-                { type: 'Customer', id },
-                'CustomerList',
-            ],
-        }),
-    }),
-});
-```
-
-### Performance Optimization Strategies
+if not __package__:
+    # Run as a plain script rather than with python -m token_tests.enterprise_token_test:
+    # make the project modules importable
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-#### Database Optimization
-- **Connection Pooling**: pgBouncer with 20 connections per service instance
-- **Read Replicas**: 2 read replicas for reporting and analytics queries  
-- **Query Optimization**: Materialized views for complex aggregations
-- **Partitioning**: Activities table partitioned by month for performance
-- **Caching Strategy**: Redis for session data and frequently accessed lookups
-
-#### Frontend Performance
-- **Code Splitting**: Route-based code splitting with React.lazy()
-- **Virtual Scrolling**: For large data tables (>1000 rows)
-- **Memoization**: React.memo and useMemo for expensive calculations
-- **Bundle Optimization**: Tree shaking and dynamic imports
-- **Asset Optimization**: Image compression and WebP format
-
-#### API Performance  
-- **Rate Limiting**: 1000 requests/minute per user, 10000/minute per organization
-- **Response Compression**: Gzip compression for all API responses
-- **Pagination**: Cursor-based pagination for large datasets
-- **Field Selection**: GraphQL-style field selection for REST endpoints
-- **Background Processing**: Kafka queues for heavy operations
-
-### Security Implementation
-
-#### Authentication & Authorization
-- **OAuth2 + OIDC**: Integration with Azure AD and SAML providers
-- **JWT Tokens**: Access tokens (15min) + refresh tokens (7 days)
-- **Role-Based Access Control**: Granular permissions system
-- **Multi-Factor Authentication**: TOTP and SMS-based MFA
-- **Session Security**: Secure cookies with SameSite and HttpOnly flags
-
-#### Data Protection
-- **Encryption at Rest**: AES-256 for database and file storage
-- **Encryption in Transit**: TLS 1.3 for all communications
-- **PII Handling**: Data masking for non-production environments
-- **Audit Logging**: Comprehensive audit trail for all data access
-- **Compliance**: GDPR, SOC2, and industry-specific requirements
-
-### Monitoring and Observability
-
-#### Application Monitoring  
-- **APM**: New Relic for application performance monitoring
-- **Logging**: Structured JSON logging with correlation IDs
-- **Metrics**: Custom business metrics (deals created, conversion rates)
-- **Alerting**: PagerDuty integration for critical issues
-- **Health Checks**: Kubernetes liveness and readiness probes
-
-#### Infrastructure Monitoring
-- **Server Metrics**: CPU, memory, disk usage via DataDog
-- **Database Monitoring**: Query performance, connection pools
-- **Network Monitoring**: Load balancer and CDN performance
-- **Cost Monitoring**: AWS cost optimization and budgeting
-- **Security Monitoring**: Intrusion detection and vulnerability scanning
-"""
-
-    # Historical context and meeting notes
-    meeting_notes = """# Meeting Notes and Project Context - Q3 2024
-
-## Executive Steering Committee Meeting - June 25, 2024
-
-### Attendees
-- Sarah Johnson (VP Engineering)
-- Michael Chen (Product Manager) 
-- David Rodriguez (Lead Architect)
-- Lisa Thompson (UX Director)
-- James Wilson (Engineering Manager)
-- Emma Davis (Senior Developer)
-- Kevin Brown (QA Manager)
-
-### Key Decisions Made
-
-#### Timeline Adjustments
-- **Decision**: Extend Phase 2 completion by 2 weeks to ensure quality
-- **Rationale**: Advanced search functionality more complex than estimated
-- **Impact**: Overall project timeline remains on track due to parallel workstreams
-- **Action Items**: Update project plan and communicate to stakeholders
-
-#### Technical Architecture Changes
-- **Decision**: Implement virtual scrolling for large data tables
-- **Rationale**: Performance issues with >1000 customer records
-- **Owner**: Emma Davis to lead implementation
-- **Timeline**: Complete by July 15th
-
-#### Resource Allocation  
-- **Decision**: Add 2 additional frontend developers for Q4
-- **Rationale**: Pipeline visualization features require specialized React expertise
-- **Budget Impact**: $180K additional cost, within approved budget range
-- **Action**: HR to begin recruitment process immediately
-
-### Risk Mitigation Updates
-
-#### Database Performance Risk - STATUS: MITIGATED
-- **Issue**: Customer search queries exceeding 5-second timeout
-- **Solution**: Implemented advanced indexing strategy
-- **Result**: Average query time reduced to 800ms  
-- **Owner**: Database team completed optimization June 20th
-
-#### Integration Complexity Risk - STATUS: MONITORING
-- **Issue**: Third-party API rate limits affecting real-time sync
-- **Current Approach**: Implementing intelligent retry logic with exponential backoff
-- **Contingency Plan**: Local caching with periodic sync if issues persist
-- **Review Date**: July 10th progress review scheduled
-
-## Sprint Planning Meeting - June 26, 2024
-
-### Sprint 24 Goals (June 18 - June 29)
-1. **Complete Advanced Search Interface** (Priority: HIGH)
-   - Current Status: 60% complete
-   - Blocking Issues: Backend API optimization needed
-   - Assigned: John Martinez, Sarah Kim
-   - Expected Completion: June 28th
-
-2. **Finish Activity Timeline Component** (Priority: HIGH)  
-   - Current Status: 70% complete
-   - Challenge: Real-time updates causing performance issues
-   - Assigned: Mike Johnson, Lisa Chen
-   - Decision: Implement virtual scrolling approach
-
-3. **Advanced Filtering Options** (Priority: MEDIUM)
-   - Current Status: 40% complete  
-   - Dependencies: Search interface completion
-   - Assigned: David Park
-   - Expected Completion: July 3rd (spillover to next sprint)
-
-### Technical Debt Items Addressed
-- **Refactored Customer List Component**: Improved rendering performance by 40%
-- **Updated Design System**: Standardized button and input components
-- **Fixed Memory Leaks**: Resolved React component cleanup issues
-- **API Response Caching**: Implemented intelligent cache invalidation
-
-## Architecture Review Meeting - June 24, 2024
-
-### Performance Benchmarking Results
-- **Customer Search**: Average 800ms response time (target: <2s) ✅
-- **Opportunity Loading**: 1.2s for pipeline view (target: <2s) ✅  
-- **Activity Timeline**: 3.5s for 1000+ items (target: <2s) ❌ NEEDS WORK
-- **Dashboard Load**: 2.8s initial load (target: <3s) ✅
-
-### Scalability Planning
-- **Current Load**: 500 concurrent users during peak hours
-- **Target Load**: 2000 concurrent users by Q4 2024
-- **Infrastructure Plan**: Auto-scaling group configuration in progress
-- **Database Scaling**: Read replica performance testing scheduled
-
-### Security Audit Findings
-- **CRITICAL**: No critical security vulnerabilities found ✅
-- **HIGH**: 2 high-priority items addressed in current sprint
-- **MEDIUM**: 5 medium-priority items scheduled for Q4
-- **Compliance**: SOC2 Type II audit scheduled for August 2024
-
-## Stakeholder Feedback Session - June 20, 2024
-
-### User Feedback from Beta Testing (50 internal users)
-- **Overall Satisfaction**: 4.2/5 stars
-- **Most Requested Feature**: Mobile responsive design (scheduled Q4)
-- **Performance Concerns**: Dashboard load time (being addressed)
-- **UI/UX Feedback**: Generally positive, minor navigation improvements needed
+from database import (temporary_database, work_item_txn, 
+                      get_work_items_for_project, get_completion_stats, 
+                      build_hierarchy_with_summaries)
+from project_id import get_project_id
+from token_tests._tokens import estimate_tokens, count_tokens_batch
 
-### Sales Team Input (10 beta testers)
-- **Critical Need**: Bulk operations for customer data updates
-- **Workflow Improvement**: Integration with email platforms (Outlook, Gmail)
-- **Reporting Request**: Custom dashboard widgets for territory management
-- **Training Requirement**: 2-hour training sessions needed for advanced features
+# The traditional context documents live in a data file next to this script,
+# one section per "%%% name" sentinel line, and are read once at import
+_CONTEXT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "enterprise_context.txt")
+_SENTINEL = re.compile(r"^%%% (\w+)\n", re.MULTILINE)
 
-### IT Department Requirements
-- **Security**: Single sign-on integration with existing Active Directory ✅
-- **Backup**: Daily automated backups with 30-day retention ✅
-- **Monitoring**: Integration with existing Splunk infrastructure ✅
-- **Deployment**: Blue-green deployment strategy for zero downtime ✅
+def _load_context_sections(path):
+    """Split the context data file into {section name: text}"""
+    with open(path, encoding="utf-8", newline="") as f:
+        parts = _SENTINEL.split(f.read())
+    return dict(zip(parts[1::2], parts[2::2]))
 
-## Technical Deep Dive - Customer Search Optimization
+_SECTIONS = _load_context_sections(_CONTEXT_FILE)
 
-### Problem Statement  
-Customer search functionality was experiencing significant performance degradation with large datasets (>100K customers). Initial implementation using basic SQL LIKE queries was insufficient for enterprise-scale data.
+# Main project tracking file (realistic size for active project)
+_PROJECT_PLAN = _SECTIONS["project_plan"]
 
-### Solution Implementation
-1. **Full-Text Search**: Implemented PostgreSQL GIN indexes with tsvector
-2. **Intelligent Caching**: Redis-based caching for common search patterns  
-3. **Query Optimization**: Restructured database queries to use covering indexes
-4. **Result Pagination**: Implemented cursor-based pagination for large result sets
+# Detailed technical documentation
+_TECHNICAL_DOCS = _SECTIONS["technical_docs"]
 
-### Performance Results
-- **Before**: 8-12 seconds for complex searches
-- **After**: 600-900ms for equivalent searches  
-- **Improvement**: 90%+ performance improvement
-- **Scalability**: Tested up to 500K customer records with consistent performance
+# Historical context and meeting notes
+_MEETING_NOTES = _SECTIONS["meeting_notes"]
 
-### Code Examples
-```sql
--- Optimized search query with GIN index
-SELECT c.id, c.company_name, c.industry, c.annual_revenue
-FROM customers c 
-WHERE to_tsvector('english', c.company_name || ' ' || COALESCE(c.industry, '')) @@ plainto_tsquery('tech startup')
-  AND c.customer_status = 'active'
-  AND c.annual_revenue >= 1000000
-ORDER BY ts_rank_cd(to_tsvector('english', c.company_name), plainto_tsquery('tech startup')) DESC
-LIMIT 25;
-```
+# The documents never change, so their token counts are computed once at import
+_PROJECT_PLAN_TOKENS, _TECHNICAL_DOCS_TOKENS, _MEETING_NOTES_TOKENS = count_tokens_batch(
+    [_PROJECT_PLAN, _TECHNICAL_DOCS, _MEETING_NOTES]
+)
+_TOTAL_TRADITIONAL_TOKENS = _PROJECT_PLAN_TOKENS + _TECHNICAL_DOCS_TOKENS + _MEETING_NOTES_TOKENS
 
-## Project Retrospective Notes
+def get_traditional_token_count():
+    """Total tokens in the traditional context documents"""
+    return _TOTAL_TRADITIONAL_TOKENS
 
-### What's Working Well
-- **Team Collaboration**: Cross-functional team communication excellent
-- **Code Quality**: TypeScript adoption reducing bugs by 60%
-- **Performance**: Database optimization yielding significant improvements
-- **User Engagement**: Beta user feedback consistently positive
+def iter_traditional_contexts():
+    """Yield (section name, text, token count) for each traditional context document in turn"""
+    yield "project_plan", _PROJECT_PLAN, _PROJECT_PLAN_TOKENS
+    yield "technical_docs", _TECHNICAL_DOCS, _TECHNICAL_DOCS_TOKENS
+    yield "meeting_notes", _MEETING_NOTES, _MEETING_NOTES_TOKENS
 
-### Areas for Improvement  
-- **Estimation Accuracy**: Frontend tasks consistently underestimated by 20%
-- **Testing Coverage**: Need to increase automated test coverage above 80%
-- **Documentation**: Technical documentation lagging behind implementation
-- **Dependency Management**: Better coordination needed with external vendor APIs
+def create_massive_traditional_context():
+    """
+    Simulate a real enterprise project with extensive documentation
+    that an AI agent would typically receive as context
+    """
+    return {section: text for section, text, _ in iter_traditional_contexts()}
 
-### Action Items for Q4
-1. **Improve Estimation Process**: Historical data analysis for better estimates
-2. **Increase Test Coverage**: Dedicated sprint for test development
-3. **Documentation Sprint**: 2-week focused effort on technical docs
-4. **Vendor Coordination**: Weekly sync meetings with external API providers
-"""
+# The traditional half of the report only depends on the constant documents,
+# so it is formatted once at import
+_TRADITIONAL_REPORT = "\n".join(
+    f"  {section}: {len(text):,} chars → {tokens:,} tokens"
+    for section, text, tokens in iter_traditional_contexts()
+) + f"\n\n📊 Traditional total context: {_TOTAL_TRADITIONAL_TOKENS:,} tokens"
 
-    return {
-        "project_plan": project_plan,
-        "technical_docs": technical_docs,
-        "meeting_notes": meeting_notes
-    }
+# The benchmark runs against a private in-memory database, so no tasks.db is
+# written and repeated runs never see each other's items. Shared cache lets the
+# database module's per-call connections all reach it.
+_MEMORY_DATABASE = "file:enterprise_token_test?mode=memory&cache=shared"
 
 def create_focused_mcp_context():
     """What the agent gets with MCP: just current incomplete work"""
     
-    init_database()
-    
-    # Use unique project
-    project_info = "https://github.com/enterprise/crm-system-v2" 
-    project_data = get_project_id(project_info)
-    project_id = project_data["project_id"]
-    
-    # Create realistic enterprise project structure
-    project_item_id = create_work_item(
-        project_id, "project", "Enterprise CRM System", 
-        "Next-generation CRM system replacing legacy Salesforce", None
-    )["id"]
-    
-    # Phase 1: Data Migration (COMPLETED)
-    phase1_id = create_work_item(
-        project_id, "phase", "Data Migration and Core Infrastructure",
-        "Legacy data migration and backend services", project_item_id
-    )["id"]
-    complete_item(phase1_id, project_id)
-    
-    # Phase 2: UI/UX (IN PROGRESS - this will show incomplete items)
-    phase2_id = create_work_item(
-        project_id, "phase", "User Interface and Experience", 
-        "Frontend application development", project_item_id
-    )["id"]
-    
-    # Epic 2.1: Core UI Framework (PARTIALLY COMPLETE)
-    ui_framework_id = create_work_item(
-        project_id, "task", "Core UI Framework",
-        "Design system and navigation components", phase2_id
-    )["id"]
-    
-    # Some completed UI work
-    nav_story_id = create_work_item(
-        project_id, "subtask", "Navigation and Layout", 
-        "Main navigation, sidebar, breadcrumbs", ui_framework_id
-    )["id"]
-    
-    # These show as incomplete (what agent needs to focus on)
-    create_work_item(project_id, "subtask", "Advanced search interface", 
-                    "Complex search with filters and facets", ui_framework_id)
-    create_work_item(project_id, "subtask", "User dashboard customization",
-                    "Drag-drop dashboard widgets", ui_framework_id) 
-    create_work_item(project_id, "subtask", "Notification center implementation",
-                    "Real-time notifications system", ui_framework_id)
-    
-    # Epic 2.2: Customer Management Interface (PARTIALLY COMPLETE)
-    customer_ui_id = create_work_item(
-        project_id, "task", "Customer Management Interface",
-        "Customer listing, search, and detail views", phase2_id
-    )["id"]
-    
-    # Current sprint work (incomplete)
-    create_work_item(project_id, "subtask", "Advanced filtering options",
-                    "Multi-criteria filters for customer search", customer_ui_id)
-    create_work_item(project_id, "subtask", "Activity timeline component", 
-                    "Real-time activity feed with virtual scrolling", customer_ui_id)
-    create_work_item(project_id, "subtask", "Bulk operations interface",
-                    "Multi-select customer operations", customer_ui_id)
-    create_work_item(project_id, "subtask", "Document management UI",
-                    "File attachments and document viewer", customer_ui_id)
-    
-    # Epic 2.3: Sales Pipeline (NOT STARTED - high priority)
-    pipeline_ui_id = create_work_item(
-        project_id, "task", "Sales Pipeline Interface",
-        "Opportunity management and pipeline visualization", phase2_id  
-    )["id"]
-    
-    create_work_item(project_id, "subtask", "Kanban board for opportunities",
-                    "Drag-drop opportunity pipeline", pipeline_ui_id)
-    create_work_item(project_id, "subtask", "Pipeline stage management", 
-                    "Stage configuration and automation", pipeline_ui_id)
-    create_work_item(project_id, "subtask", "Deal value tracking",
-                    "Revenue forecasting and probability", pipeline_ui_id)
-    
-    # Phase 3: Advanced Features (NOT STARTED)
-    phase3_id = create_work_item(
-        project_id, "phase", "Advanced Features and Integrations",
-        "Marketing automation and analytics", project_item_id
-    )["id"]
-    
-    # Add some high-level tasks for Phase 3
-    create_work_item(project_id, "task", "Marketing Automation",
-                    "Campaign management and lead scoring", phase3_id)
-    create_work_item(project_id, "task", "Reporting and Analytics", 
-                    "Custom report builder and dashboards", phase3_id)
-    create_work_item(project_id, "task", "Third-party Integrations",
-                    "Teams, Slack, email platform integrations", phase3_id)
-    
-    # Phase 4: Testing and Deployment (NOT STARTED)
-    phase4_id = create_work_item(
-        project_id, "phase", "Testing, Security, and Deployment",
-        "QA, performance testing, and production deployment", project_item_id
-    )["id"]
-    
-    create_work_item(project_id, "task", "Quality Assurance",
-                    "Automated testing and performance optimization", phase4_id)
-    create_work_item(project_id, "task", "Production Deployment",
-                    "Infrastructure setup and go-live support", phase4_id)
-    
-    # Get rolling work plan (incomplete items with completion summaries)
-    incomplete_items = get_work_items_for_project(project_id)
-    all_items = get_all_work_items_for_project(project_id)
-    hierarchy = build_hierarchy(incomplete_items) 
-    work_plan = add_completion_summaries(hierarchy, all_items)
-    
-    return work_plan, project_id
+    # The in-memory database lives until the block ends, then the previous path is restored
+    with temporary_database(_MEMORY_DATABASE):
+        # Use unique project
+        project_info = "https://github.com/enterprise/crm-system-v2" 
+        project_data = get_project_id(project_info)
+        project_id = project_data["project_id"]
+        
+        # Create realistic enterprise project structure and its progress in a single transaction
+        with work_item_txn(project_id) as session:
+            created = session.create_work_items_bulk([
+                {"key": "project", "type": "project", "title": "Enterprise CRM System",
+                 "description": "Next-generation CRM system replacing legacy Salesforce"},
+                
+                # Phase 1: Data Migration (COMPLETED)
+                {"key": "phase1", "type": "phase", "title": "Data Migration and Core Infrastructure",
+                 "description": "Legacy data migration and backend services", "parent": "project"},
+                
+                # Phase 2: UI/UX (IN PROGRESS - this will show incomplete items)
+                {"key": "phase2", "type": "phase", "title": "User Interface and Experience",
+                 "description": "Frontend application development", "parent": "project"},
+                
+                # Epic 2.1: Core UI Framework (PARTIALLY COMPLETE)
+                {"key": "ui_framework", "type": "task", "title": "Core UI Framework",
+                 "description": "Design system and navigation components", "parent": "phase2"},
+                
+                # Some completed UI work
+                {"type": "subtask", "title": "Navigation and Layout",
+                 "description": "Main navigation, sidebar, breadcrumbs", "parent": "ui_framework"},
+                
+                # These show as incomplete (what agent needs to focus on)
+                {"type": "subtask", "title": "Advanced search interface",
+                 "description": "Complex search with filters and facets", "parent": "ui_framework"},
+                {"type": "subtask", "title": "User dashboard customization",
+                 "description": "Drag-drop dashboard widgets", "parent": "ui_framework"},
+                {"type": "subtask", "title": "Notification center implementation",
+                 "description": "Real-time notifications system", "parent": "ui_framework"},
+                
+                # Epic 2.2: Customer Management Interface (PARTIALLY COMPLETE)
+                {"key": "customer_ui", "type": "task", "title": "Customer Management Interface",
+                 "description": "Customer listing, search, and detail views", "parent": "phase2"},
+                
+                # Current sprint work (incomplete)
+                {"type": "subtask", "title": "Advanced filtering options",
+                 "description": "Multi-criteria filters for customer search", "parent": "customer_ui"},
+                {"type": "subtask", "title": "Activity timeline component",
+                 "description": "Real-time activity feed with virtual scrolling", "parent": "customer_ui"},
+                {"type": "subtask", "title": "Bulk operations interface",
+                 "description": "Multi-select customer operations", "parent": "customer_ui"},
+                {"type": "subtask", "title": "Document management UI",
+                 "description": "File attachments and document viewer", "parent": "customer_ui"},
+                
+                # Epic 2.3: Sales Pipeline (NOT STARTED - high priority)
+                {"key": "pipeline_ui", "type": "task", "title": "Sales Pipeline Interface",
+                 "description": "Opportunity management and pipeline visualization", "parent": "phase2"},
+                {"type": "subtask", "title": "Kanban board for opportunities",
+                 "description": "Drag-drop opportunity pipeline", "parent": "pipeline_ui"},
+                {"type": "subtask", "title": "Pipeline stage management",
+                 "description": "Stage configuration and automation", "parent": "pipeline_ui"},
+                {"type": "subtask", "title": "Deal value tracking",
+                 "description": "Revenue forecasting and probability", "parent": "pipeline_ui"},
+                
+                # Phase 3: Advanced Features (NOT STARTED)
+                {"key": "phase3", "type": "phase", "title": "Advanced Features and Integrations",
+                 "description": "Marketing automation and analytics", "parent": "project"},
+                {"type": "task", "title": "Marketing Automation",
+                 "description": "Campaign management and lead scoring", "parent": "phase3"},
+                {"type": "task", "title": "Reporting and Analytics",
+                 "description": "Custom report builder and dashboards", "parent": "phase3"},
+                {"type": "task", "title": "Third-party Integrations",
+                 "description": "Teams, Slack, email platform integrations", "parent": "phase3"},
+                
+                # Phase 4: Testing and Deployment (NOT STARTED)
+                {"key": "phase4", "type": "phase", "title": "Testing, Security, and Deployment",
+                 "description": "QA, performance testing, and production deployment", "parent": "project"},
+                {"type": "task", "title": "Quality Assurance",
+                 "description": "Automated testing and performance optimization", "parent": "phase4"},
+                {"type": "task", "title": "Production Deployment",
+                 "description": "Infrastructure setup and go-live support", "parent": "phase4"},
+            ])
+            
+            phase1_id = created[1]["id"]
+            session.complete_item(phase1_id)
+        
+        # Get rolling work plan (incomplete items with completion summaries)
+        # Only incomplete rows are fetched; summaries come from per-parent counts
+        incomplete_items = get_work_items_for_project(project_id)
+        completion_stats = get_completion_stats(project_id)
+        work_plan = build_hierarchy_with_summaries(incomplete_items, completion_stats=completion_stats)
+        
+        return work_plan, project_id
 
 def run_enterprise_comparison():
     """Run enterprise-scale token usage comparison"""
     
-    print("🏢 Enterprise-Scale Token Usage Comparison")
-    print("=" * 80)
-    print("Scenario: AI agent working on large, complex enterprise CRM project")
-    print("=" * 80)
+    # Buffer the report and write it once at the end
+    report = []
+    emit = report.append
     
-    # Traditional: Massive context (everything)
-    print("\n📚 Traditional approach - Full enterprise project context...")
-    traditional_files = create_massive_traditional_context()
+    emit("🏢 Enterprise-Scale Token Usage Comparison")
+    emit("=" * 80)
+    emit("Scenario: AI agent working on large, complex enterprise CRM project")
+    emit("=" * 80)
     
-    traditional_total = 0
-    for filename, content in traditional_files.items():
-        tokens = estimate_tokens(content)
-        traditional_total += tokens
-        print(f"  {filename}: {len(content):,} chars → {tokens:,} tokens")
+    # Traditional: Massive context (everything)
+    emit("\n📚 Traditional approach - Full enterprise project context...")
+    emit(_TRADITIONAL_REPORT)
     
-    print(f"\n📊 Traditional total context: {traditional_total:,} tokens")
+    traditional_total = _TOTAL_TRADITIONAL_TOKENS
     
     # MCP: Focused rolling work plan only
-    print("\n🎯 MCP approach - Rolling work plan (incomplete items only)...")
+    emit("\n🎯 MCP approach - Rolling work plan (incomplete items only)...")
     mcp_work_plan, project_id = create_focused_mcp_context()
     
+    import json  # Only needed here, so importing the module for token counts skips it
     mcp_json = json.dumps(mcp_work_plan, indent=2)
     mcp_tokens = estimate_tokens(mcp_json)
     
-    print(f"  Rolling work plan: {len(mcp_json):,} chars → {mcp_tokens:,} tokens")
+    emit(f"  Rolling work plan: {len(mcp_json):,} chars → {mcp_tokens:,} tokens")
     
     # Calculate massive token savings
     token_reduction = ((traditional_total - mcp_tokens) / traditional_total) * 100
     efficiency_multiplier = traditional_total / mcp_tokens
     
-    print("\n" + "=" * 80)
-    print("🚀 ENTERPRISE COMPARISON RESULTS")
-    print("=" * 80)
-    print(f"Traditional full context:     {traditional_total:,} tokens")
-    print(f"MCP rolling work plan:        {mcp_tokens:,} tokens") 
-    print(f"Token reduction:              {token_reduction:.1f}%")
-    print(f"Efficiency multiplier:        {efficiency_multiplier:.1f}x")
-    print(f"Context window savings:       {traditional_total - mcp_tokens:,} tokens freed")
+    emit("\n" + "=" * 80)
+    emit("🚀 ENTERPRISE COMPARISON RESULTS")
+    emit("=" * 80)
+    emit(f"Traditional full context:     {traditional_total:,} tokens")
+    emit(f"MCP rolling work plan:        {mcp_tokens:,} tokens") 
+    emit(f"Token reduction:              {token_reduction:.1f}%")
+    emit(f"Efficiency multiplier:        {efficiency_multiplier:.1f}x")
+    emit(f"Context window savings:       {traditional_total - mcp_tokens:,} tokens freed")
     
     if token_reduction >= 80:
-        print(f"\n🎉 MASSIVE SUCCESS: {token_reduction:.1f}% token reduction!")
-        print(f"   Equivalent to {efficiency_multiplier:.1f}x more efficient context usage")
+        emit(f"\n🎉 MASSIVE SUCCESS: {token_reduction:.1f}% token reduction!")
+        emit(f"   Equivalent to {efficiency_multiplier:.1f}x more efficient context usage")
     else:
-        print(f"\n⚠️  Results: {token_reduction:.1f}% reduction")
+        emit(f"\n⚠️  Results: {token_reduction:.1f}% reduction")
     
     # Additional insights
-    active_items = len([item for item in flatten_work_items(mcp_work_plan) 
-                       if 'status' in item and item.get('status') != 'completed'])
+    active_items = sum(1 for item in iter_work_items(mcp_work_plan)
+                       if 'status' in item and item['status'] != 'completed')
     
-    print(f"\n🔍 DETAILED ANALYSIS:")
-    print(f"• Traditional: Agent gets ALL project history, docs, notes, meetings")
-    print(f"• MCP: Agent gets {active_items} focused work items needing attention")
-    print(f"• Completed work shows as summaries (e.g., 'Phase 1: ✓ All 4 tasks completed')")
-    print(f"• Agent cognitive load reduced by {token_reduction:.0f}%")
-    print(f"• Context stays laser-focused on current sprint priorities")
-    print(f"• Equivalent to fitting {efficiency_multiplier:.1f}x more projects in same context window")
+    emit(f"\n🔍 DETAILED ANALYSIS:")
+    emit(f"• Traditional: Agent gets ALL project history, docs, notes, meetings")
+    emit(f"• MCP: Agent gets {active_items} focused work items needing attention")
+    emit(f"• Completed work shows as summaries (e.g., 'Phase 1: ✓ All 4 tasks completed')")
+    emit(f"• Agent cognitive load reduced by {token_reduction:.0f}%")
+    emit(f"• Context stays laser-focused on current sprint priorities")
+    emit(f"• Equivalent to fitting {efficiency_multiplier:.1f}x more projects in same context window")
     
     # Real-world impact
-    print(f"\n💡 REAL-WORLD IMPACT:")
+    emit(f"\n💡 REAL-WORLD IMPACT:")
     if efficiency_multiplier >= 5:
-        print(f"• Agent can handle {int(efficiency_multiplier)} projects simultaneously")
-        print(f"• {token_reduction:.0f}% faster processing (less context to parse)")
-        print(f"• Much higher accuracy (focused on relevant current work)")
-        print(f"• No distraction from completed work or historical context")
+        emit(f"• Agent can handle {int(efficiency_multiplier)} projects simultaneously")
+        emit(f"• {token_reduction:.0f}% faster processing (less context to parse)")
+        emit(f"• Much higher accuracy (focused on relevant current work)")
+        emit(f"• No distraction from completed work or historical context")
+    
+    sys.stdout.write("\n".join(report) + "\n")
     
     return {
         "traditional_tokens": traditional_total,
@@ -941,21 +254,18 @@ def run_enterprise_comparison():
         "project_id": project_id
     }
 
-def flatten_work_items(obj, items=None):
-    """Recursively flatten work items for counting"""
-    if items is None:
-        items = []
-        
-    if isinstance(obj, dict):
+def iter_work_items(obj):
+    """Recursively yield every work item in a work plan, without building a list"""
+    # Exact type checks: the plan holds only plain dicts and lists from the JSON-ready hierarchy
+    obj_type = type(obj)
+    if obj_type is dict:
         if 'id' in obj and 'type' in obj:
-            items.append(obj)
+            yield obj
         for value in obj.values():
-            flatten_work_items(value, items)
-    elif isinstance(obj, list):
+            yield from iter_work_items(value)
+    elif obj_type is list:
         for item in obj:
-            flatten_work_items(item, items)
-            
-    return items
+            yield from iter_work_items(item)
 
 if __name__ == "__main__":
     results = run_enterprise_comparison()
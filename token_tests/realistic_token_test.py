@@ -17,23 +17,12 @@ from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import init_database, get_connection, create_work_item, complete_item, get_work_items_for_project, get_all_work_items_for_project, build_hierarchy, add_completion_summaries
+from database import temporary_database, work_item_txn, get_work_items_for_project, get_completion_stats, build_hierarchy_with_summaries
 from project_id import get_project_id
+from token_tests._tokens import estimate_tokens
 
-def estimate_tokens(text):
-    """Simple token estimation (~4 chars per token)"""
-    return len(text) // 4
-
-def create_realistic_traditional_context():
-    """
-    What an AI agent typically gets with traditional file-based task management:
-    - Main project file with ALL items (completed and incomplete)
-    - Historical context files
-    - Status files
-    - Notes and documentation
-    """
-    
-    main_project_file = """# E-Commerce Platform Development Project
+# Main project file with ALL items (completed and incomplete)
+_MAIN_PROJECT_FILE = """# E-Commerce Platform Development Project
 
 ## Project Overview
 Building a full-stack e-commerce platform with React frontend, Node.js backend, and PostgreSQL database.
@@ -194,7 +183,8 @@ Started: January 2024 | Current Status: 65% Complete | Target: March 2024
 - PM: Tracking toward March 31st launch date, considering scope reduction
 """
 
-    completed_work_log = """# Completed Work Log - E-Commerce Project
+# Historical context: everything already finished
+_COMPLETED_WORK_LOG = """# Completed Work Log - E-Commerce Project
 
 ## February 2024 Completions
 
@@ -271,7 +261,8 @@ Started: January 2024 | Current Status: 65% Complete | Target: March 2024
 - Used React Hook Form for form validation and state
 """
 
-    development_notes = """# Development Notes & Context
+# Notes and documentation
+_DEVELOPMENT_NOTES = """# Development Notes & Context
 
 ## Architecture Decisions
 - **Backend**: Node.js with Express.js framework
@@ -344,11 +335,34 @@ Started: January 2024 | Current Status: 65% Complete | Target: March 2024
 - Monitoring and alerting setup
 """
 
-    return {
-        "main_project": main_project_file,
-        "completed_log": completed_work_log, 
-        "dev_notes": development_notes
-    }
+_TRADITIONAL_FILES = {
+    "main_project": _MAIN_PROJECT_FILE,
+    "completed_log": _COMPLETED_WORK_LOG,
+    "dev_notes": _DEVELOPMENT_NOTES
+}
+
+# The files never change, so their token counts are computed once at import
+_TRADITIONAL_FILE_TOKENS = {name: estimate_tokens(text) for name, text in _TRADITIONAL_FILES.items()}
+_TRADITIONAL_TOTAL_TOKENS = sum(_TRADITIONAL_FILE_TOKENS.values())
+
+def create_realistic_traditional_context():
+    """
+    What an AI agent typically gets with traditional file-based task management:
+    - Main project file with ALL items (completed and incomplete)
+    - Historical context files
+    - Status files
+    - Notes and documentation
+    """
+    return dict(_TRADITIONAL_FILES)
+
+# The fixture is built in a private in-memory database, so no tasks.db is written
+# and reruns never pile up copies of the project. Shared cache lets the database
+# module's per-call connections all reach it while one stays open.
+_MEMORY_DATABASE = "file:realistic_token_test?mode=memory&cache=shared"
+
+# Use a different project to avoid conflicts; its ID never changes, so derive it once
+_PROJECT_INFO = "https://github.com/test-user/ecommerce-platform"
+_PROJECT_ID = get_project_id(_PROJECT_INFO)["project_id"]
 
 def create_realistic_mcp_context():
     """
@@ -356,169 +370,136 @@ def create_realistic_mcp_context():
     Only incomplete items, with completion summaries for context
     """
     
-    init_database()
-    
-    # Use a different project to avoid conflicts
-    project_info = "https://github.com/test-user/ecommerce-platform"
-    project_data = get_project_id(project_info)
-    project_id = project_data["project_id"]
-    
-    # Create project with realistic completion state
-    project_item_id = create_work_item(
-        project_id, "project", "E-Commerce Platform Development", 
-        "Full-stack e-commerce platform with React and Node.js", None
-    )["id"]
-    
-    # Phase 1: Backend (COMPLETED) - will show as completion summary
-    backend_phase_id = create_work_item(
-        project_id, "phase", "Backend Development",
-        "Complete backend implementation", project_item_id
-    )["id"]
-    
-    # Add completed backend tasks (these will be summarized)
-    tasks = [
-        ("Database Design", "PostgreSQL schema and setup"),
-        ("Authentication System", "JWT and OAuth implementation"),  
-        ("Product Management API", "CRUD operations for products"),
-        ("Order Management System", "Shopping cart and order processing")
-    ]
-    
-    for task_title, task_desc in tasks:
-        task_id = create_work_item(
-            project_id, "task", task_title, task_desc, backend_phase_id
-        )["id"]
-        complete_item(task_id, project_id)
-    
-    # Complete the entire backend phase
-    complete_item(backend_phase_id, project_id)
-    
-    # Phase 2: Frontend (IN PROGRESS) - will show incomplete items
-    frontend_phase_id = create_work_item(
-        project_id, "phase", "Frontend Development",
-        "React-based user interface", project_item_id
-    )["id"]
-    
-    # Task 2.1: React Setup (COMPLETED)
-    react_setup_id = create_work_item(
-        project_id, "task", "React Application Setup",
-        "Initialize and configure React app", frontend_phase_id
-    )["id"]
-    complete_item(react_setup_id, project_id)
-    
-    # Task 2.2: UI Components (PARTIALLY COMPLETED)  
-    ui_components_id = create_work_item(
-        project_id, "task", "User Interface Components", 
-        "Reusable React components", frontend_phase_id
-    )["id"]
-    
-    # Some completed UI components
-    completed_components = [
-        "Header and navigation components",
-        "Footer component", 
-        "Loading and spinner components",
-        "Button and form components",
-        "Modal and dialog components",
-        "Product card component"
-    ]
-    
-    for comp in completed_components:
-        comp_id = create_work_item(
-            project_id, "subtask", comp, f"Component: {comp}", ui_components_id
-        )["id"]
-        complete_item(comp_id, project_id)
-    
-    # Incomplete UI components (these will show in rolling work plan)
-    incomplete_components = [
-        "Shopping cart sidebar component", 
-        "User profile components",
-        "Admin dashboard components",
-        "Search and filter components"
-    ]
-    
-    for comp in incomplete_components:
-        create_work_item(
-            project_id, "subtask", comp, f"Component: {comp}", ui_components_id
-        )
-    
-    # Task 2.3: Page Components (PARTIALLY COMPLETED)
-    page_components_id = create_work_item(
-        project_id, "task", "Page Components",
-        "Full page React components", frontend_phase_id  
-    )["id"]
-    
-    # Incomplete page components
-    incomplete_pages = [
-        "Shopping cart page",
-        "Checkout process pages", 
-        "User profile and account pages",
-        "Order history and tracking pages",
-        "Admin product management pages"
-    ]
-    
-    for page in incomplete_pages:
-        create_work_item(
-            project_id, "subtask", page, f"Page: {page}", page_components_id
-        )
-    
-    # Task 2.4: API Integration (IN PROGRESS)
-    api_integration_id = create_work_item(
-        project_id, "task", "API Integration",
-        "Connect frontend to backend APIs", frontend_phase_id
-    )["id"]
-    
-    # Incomplete API integrations  
-    incomplete_apis = [
-        "Shopping cart API integration",
-        "Order management API integration", 
-        "User profile API integration",
-        "Search and filter API integration"
-    ]
-    
-    for api in incomplete_apis:
-        create_work_item(
-            project_id, "subtask", api, f"API: {api}", api_integration_id
-        )
-    
-    # Phase 3: Testing (NOT STARTED)
-    testing_phase_id = create_work_item(
-        project_id, "phase", "Testing and Quality Assurance",
-        "Comprehensive testing strategy", project_item_id
-    )["id"]
-    
-    testing_tasks = [
-        "Backend Testing",
-        "Frontend Testing",
-        "User Acceptance Testing"
-    ]
-    
-    for task_title in testing_tasks:
-        create_work_item(
-            project_id, "task", task_title, f"Testing: {task_title}", testing_phase_id
-        )
-    
-    # Phase 4: Deployment (NOT STARTED) 
-    deployment_phase_id = create_work_item(
-        project_id, "phase", "Deployment and Production",
-        "Production deployment setup", project_item_id
-    )["id"]
-    
-    deployment_tasks = [
-        "Infrastructure Setup",
-        "Production Deployment"
-    ]
-    
-    for task_title in deployment_tasks:
-        create_work_item(
-            project_id, "task", task_title, f"Deployment: {task_title}", deployment_phase_id
-        )
-    
-    # Get rolling work plan (only incomplete items with completion summaries)
-    incomplete_items = get_work_items_for_project(project_id)
-    all_items = get_all_work_items_for_project(project_id)
-    hierarchy = build_hierarchy(incomplete_items)
-    work_plan = add_completion_summaries(hierarchy, all_items)
-    
-    return work_plan, project_id
+    # Build in a private in-memory database; the previous database path comes back afterwards
+    with temporary_database(_MEMORY_DATABASE):
+        project_id = _PROJECT_ID
+        
+        # Add completed backend tasks (these will be summarized)
+        tasks = [
+            ("Database Design", "PostgreSQL schema and setup"),
+            ("Authentication System", "JWT and OAuth implementation"),  
+            ("Product Management API", "CRUD operations for products"),
+            ("Order Management System", "Shopping cart and order processing")
+        ]
+        
+        # Some completed UI components
+        completed_components = [
+            "Header and navigation components",
+            "Footer component", 
+            "Loading and spinner components",
+            "Button and form components",
+            "Modal and dialog components",
+            "Product card component"
+        ]
+        
+        # Incomplete UI components (these will show in rolling work plan)
+        incomplete_components = [
+            "Shopping cart sidebar component", 
+            "User profile components",
+            "Admin dashboard components",
+            "Search and filter components"
+        ]
+        
+        # Incomplete page components
+        incomplete_pages = [
+            "Shopping cart page",
+            "Checkout process pages", 
+            "User profile and account pages",
+            "Order history and tracking pages",
+            "Admin product management pages"
+        ]
+        
+        # Incomplete API integrations  
+        incomplete_apis = [
+            "Shopping cart API integration",
+            "Order management API integration", 
+            "User profile API integration",
+            "Search and filter API integration"
+        ]
+        
+        testing_tasks = [
+            "Backend Testing",
+            "Frontend Testing",
+            "User Acceptance Testing"
+        ]
+        
+        deployment_tasks = [
+            "Infrastructure Setup",
+            "Production Deployment"
+        ]
+        
+        # Create project with realistic completion state
+        specs = [
+            {"key": "project", "type": "project", "title": "E-Commerce Platform Development",
+             "description": "Full-stack e-commerce platform with React and Node.js"},
+            
+            # Phase 1: Backend (COMPLETED) - will show as completion summary
+            {"key": "backend", "type": "phase", "title": "Backend Development",
+             "description": "Complete backend implementation", "parent": "project"},
+            *({"key": f"backend_task{i}", "type": "task", "title": task_title,
+               "description": task_desc, "parent": "backend"}
+              for i, (task_title, task_desc) in enumerate(tasks)),
+            
+            # Phase 2: Frontend (IN PROGRESS) - will show incomplete items
+            {"key": "frontend", "type": "phase", "title": "Frontend Development",
+             "description": "React-based user interface", "parent": "project"},
+            
+            # Task 2.1: React Setup (COMPLETED)
+            {"key": "react_setup", "type": "task", "title": "React Application Setup",
+             "description": "Initialize and configure React app", "parent": "frontend"},
+            
+            # Task 2.2: UI Components (PARTIALLY COMPLETED)  
+            {"key": "ui_components", "type": "task", "title": "User Interface Components",
+             "description": "Reusable React components", "parent": "frontend"},
+            *({"key": f"component{i}", "type": "subtask", "title": comp,
+               "description": f"Component: {comp}", "parent": "ui_components"}
+              for i, comp in enumerate(completed_components)),
+            *({"type": "subtask", "title": comp, "description": f"Component: {comp}", "parent": "ui_components"}
+              for comp in incomplete_components),
+            
+            # Task 2.3: Page Components (PARTIALLY COMPLETED)
+            {"key": "page_components", "type": "task", "title": "Page Components",
+             "description": "Full page React components", "parent": "frontend"},
+            *({"type": "subtask", "title": page, "description": f"Page: {page}", "parent": "page_components"}
+              for page in incomplete_pages),
+            
+            # Task 2.4: API Integration (IN PROGRESS)
+            {"key": "api_integration", "type": "task", "title": "API Integration",
+             "description": "Connect frontend to backend APIs", "parent": "frontend"},
+            *({"type": "subtask", "title": api, "description": f"API: {api}", "parent": "api_integration"}
+              for api in incomplete_apis),
+            
+            # Phase 3: Testing (NOT STARTED)
+            {"key": "testing", "type": "phase", "title": "Testing and Quality Assurance",
+             "description": "Comprehensive testing strategy", "parent": "project"},
+            *({"type": "task", "title": task_title, "description": f"Testing: {task_title}", "parent": "testing"}
+              for task_title in testing_tasks),
+            
+            # Phase 4: Deployment (NOT STARTED) 
+            {"key": "deployment", "type": "phase", "title": "Deployment and Production",
+             "description": "Production deployment setup", "parent": "project"},
+            *({"type": "task", "title": task_title, "description": f"Deployment: {task_title}", "parent": "deployment"}
+              for task_title in deployment_tasks),
+        ]
+        
+        # Work finished so far: the backend tasks then their phase, React setup
+        # and the completed UI components
+        completed_keys = ([f"backend_task{i}" for i in range(len(tasks))] + ["backend", "react_setup"]
+                          + [f"component{i}" for i in range(len(completed_components))])
+        
+        # Build the whole project and its progress in a single transaction
+        with work_item_txn(project_id) as session:
+            created = session.create_work_items_bulk(specs)
+            ids_by_key = {spec["key"]: item["id"] for spec, item in zip(specs, created) if "key" in spec}
+            session.complete_items_bulk([ids_by_key[key] for key in completed_keys])
+        
+        # Get rolling work plan (only incomplete items with completion summaries)
+        # Only incomplete rows are fetched; summaries come from per-parent counts
+        incomplete_items = get_work_items_for_project(project_id)
+        completion_stats = get_completion_stats(project_id)
+        work_plan = build_hierarchy_with_summaries(incomplete_items, completion_stats=completion_stats)
+        
+        return work_plan, project_id
 
 def run_realistic_comparison():
     """Run a realistic token usage comparison"""
@@ -528,13 +509,10 @@ def run_realistic_comparison():
     
     # Traditional approach: Full project context
     print("\n📁 Traditional approach - Full project context...")
-    traditional_files = create_realistic_traditional_context()
+    for filename, content in _TRADITIONAL_FILES.items():
+        print(f"  {filename}: {len(content):,} chars → {_TRADITIONAL_FILE_TOKENS[filename]:,} tokens")
     
-    traditional_total = 0
-    for filename, content in traditional_files.items():
-        tokens = estimate_tokens(content)
-        traditional_total += tokens
-        print(f"  {filename}: {len(content):,} chars → {tokens:,} tokens")
+    traditional_total = _TRADITIONAL_TOTAL_TOKENS
     
     print(f"\n📊 Traditional total context: {traditional_total:,} tokens")
     
@@ -551,24 +529,27 @@ def run_realistic_comparison():
     token_reduction = ((traditional_total - mcp_tokens) / traditional_total) * 100
     efficiency_multiplier = traditional_total / mcp_tokens
     
+    # Format each figure once; the reduction appears in two lines
+    reduction_text = f"{token_reduction:.1f}%"
+    
     print("\n" + "=" * 70)
     print("📈 REALISTIC RESULTS SUMMARY")
     print("=" * 70)
     print(f"Traditional full context:   {traditional_total:,} tokens")
     print(f"MCP rolling work plan:      {mcp_tokens:,} tokens")
-    print(f"Token reduction:            {token_reduction:.1f}%")
+    print(f"Token reduction:            {reduction_text}")
     print(f"Efficiency multiplier:      {efficiency_multiplier:.1f}x")
     
     if token_reduction >= 80:
-        print(f"✅ SUCCESS: Achieved {token_reduction:.1f}% token reduction!")
+        print(f"✅ SUCCESS: Achieved {reduction_text} token reduction!")
     elif token_reduction >= 50:
-        print(f"⚠️  GOOD: {token_reduction:.1f}% reduction (target: 80%+)")
+        print(f"⚠️  GOOD: {reduction_text} reduction (target: 80%+)")
     else:
-        print(f"❌ INSUFFICIENT: Only {token_reduction:.1f}% reduction")
+        print(f"❌ INSUFFICIENT: Only {reduction_text} reduction")
     
     print(f"\n🔍 ANALYSIS:")
     print(f"• Traditional approach includes ALL project history and completed work")
-    print(f"• MCP shows only {len([item for item in flatten_items(mcp_work_plan) if 'status' in item and item['status'] != 'completed'])} active work items")
+    print(f"• MCP shows only {count_active(mcp_work_plan)} active work items")
     print(f"• Completed phases show as summaries (e.g., 'Backend Development: ✓ All tasks completed')")
     print(f"• Agent gets focused context on what needs attention NOW")
     print(f"• Massive reduction in cognitive load and context processing")
@@ -581,21 +562,23 @@ def run_realistic_comparison():
         "project_id": project_id
     }
 
-def flatten_items(obj, items=None):
-    """Helper to flatten nested structure for counting"""
-    if items is None:
-        items = []
-    
-    if isinstance(obj, dict):
-        if 'id' in obj and 'type' in obj:
-            items.append(obj)
-        for value in obj.values():
-            flatten_items(value, items)
-    elif isinstance(obj, list):
-        for item in obj:
-            flatten_items(item, items)
-    
-    return items
+def iter_work_items(obj):
+    """Yield every work item in a nested structure, in no particular order, without building a list"""
+    stack = [obj]
+    
+    # Walk with an explicit stack rather than recursing once per node
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if 'id' in current and 'type' in current:
+                yield current
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+
+def count_active(obj):
+    """Count the work items in a nested structure that are not completed"""
+    return sum(1 for item in iter_work_items(obj) if item.get('status') not in (None, 'completed'))
 
 if __name__ == "__main__":
     results = run_realistic_comparison()
@@ -17,23 +17,14 @@ from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import (init_database, get_connection, create_work_item, complete_item, 
+from database import (init_database, work_item_txn, 
                       get_work_items_for_project, get_all_work_items_for_project, 
                       build_hierarchy, add_completion_summaries)
 from project_id import get_project_id
+from token_tests._tokens import estimate_tokens, count_tokens_batch
 
-def estimate_tokens(text):
-    """
-    Simple token estimation (rough approximation: ~4 chars per token for English text)
-    For more accuracy, you could use tiktoken library, but this gives us ballpark numbers.
-    """
-    return len(text) // 4
-
-def create_traditional_task_files():
-    """Create traditional markdown-based task management files"""
-    
-    # Main project plan file
-    main_plan = """# Software Development Project Plan
+# Main project plan file
+_MAIN_PLAN = """# Software Development Project Plan
 
 ## Phase 1: Backend Development
 ### Task 1.1: Database Setup
@@ -125,8 +116,8 @@ def create_traditional_task_files():
 - Deployment planning should start soon to avoid bottlenecks
 """
 
-    # Additional context files that would normally be referenced
-    backend_details = """# Backend Development Details
+# Additional context files that would normally be referenced
+_BACKEND_DETAILS = """# Backend Development Details
 
 ## Database Schema
 - Users table: id, username, email, password_hash, created_at, updated_at
@@ -151,7 +142,7 @@ def create_traditional_task_files():
 - Documentation: Complete OpenAPI spec with examples
 """
 
-    frontend_details = """# Frontend Development Details
+_FRONTEND_DETAILS = """# Frontend Development Details
 
 ## Component Structure
 ```
@@ -184,11 +175,18 @@ src/
 - Dark mode support (pending)
 """
 
-    return {
-        "main_plan": main_plan,
-        "backend_details": backend_details, 
-        "frontend_details": frontend_details
-    }
+_TRADITIONAL_FILES = {
+    "main_plan": _MAIN_PLAN,
+    "backend_details": _BACKEND_DETAILS,
+    "frontend_details": _FRONTEND_DETAILS
+}
+
+# The files never change, so their token counts are computed once at import
+_TRADITIONAL_FILE_TOKENS = dict(zip(_TRADITIONAL_FILES, count_tokens_batch(list(_TRADITIONAL_FILES.values()))))
+
+def create_traditional_task_files():
+    """Create traditional markdown-based task management files"""
+    return dict(_TRADITIONAL_FILES)
 
 def create_mcp_equivalent_data():
     """Create equivalent project structure using MCP tools"""
@@ -201,101 +199,67 @@ def create_mcp_equivalent_data():
     project_data = get_project_id(project_info)
     project_id = project_data["project_id"]
     
-    with get_connection() as conn:
-        # Create the same project structure using MCP
-        
+    # API subtasks (some complete, some not)
+    subtasks = [
+        ("Set up FastAPI framework", True),
+        ("Create user authentication endpoints", True), 
+        ("Implement CRUD operations for users", True),
+        ("Add rate limiting middleware", False),
+        ("Implement API versioning", False),
+        ("Add comprehensive error handling", False),
+        ("Create API documentation", False)
+    ]
+    
+    # Add some completed and incomplete React subtasks
+    react_items = [
+        ("Initialize React project", True),
+        ("Set up routing with React Router", True),
+        ("Configure state management (Redux)", True), 
+        ("Set up styling framework (Tailwind)", True),
+        ("Add TypeScript integration", False),
+        ("Set up testing framework (Jest)", False),
+        ("Configure build optimization", False)
+    ]
+    
+    # Create the same project structure using MCP, paired with whether each
+    # item is already done (equivalent to [x] items in markdown)
+    items = [
         # First create the project
-        project_item_id = create_work_item(
-            project_id, "project", "Software Development Project", 
-            "Complete software development project with backend and frontend", None
-        )["id"]
+        ({"key": "project", "type": "project", "title": "Software Development Project",
+          "description": "Complete software development project with backend and frontend"}, False),
         
         # Phase 1: Backend Development
-        backend_phase_id = create_work_item(
-            project_id, "phase", "Backend Development", 
-            "Complete backend implementation with database and API", project_item_id
-        )["id"]
+        ({"key": "backend", "type": "phase", "title": "Backend Development",
+          "description": "Complete backend implementation with database and API", "parent": "project"}, False),
         
         # Task 1.1: Database Setup
-        db_task_id = create_work_item(
-            project_id, "task", "Database Setup",
-            "Set up database schema, migrations, and optimization", backend_phase_id
-        )["id"]
-        
-        # Complete some subtasks (equivalent to checked items in markdown)
-        create_work_item(project_id, "subtask", "Design schema", "Database design", db_task_id)
-        create_work_item(project_id, "subtask", "Create migrations", "Database migrations", db_task_id)
-        create_work_item(project_id, "subtask", "Set up connection pooling", "Connection pooling", db_task_id)
-        
-        # Mark first 3 as completed (equivalent to [x] items)
-        with get_connection() as conn:
-            db_subtasks = conn.execute(
-                "SELECT id FROM work_items WHERE parent_id = ? AND type = 'subtask' ORDER BY order_index LIMIT 3",
-                (db_task_id,)
-            ).fetchall()
-            
-            for subtask in db_subtasks:
-                complete_item(subtask["id"], project_id)
-                
-        # Add remaining incomplete items
-        create_work_item(project_id, "subtask", "Add database indexes", "Performance indexes", db_task_id)
-        create_work_item(project_id, "subtask", "Performance optimization", "Query optimization", db_task_id)
+        ({"key": "db_task", "type": "task", "title": "Database Setup",
+          "description": "Set up database schema, migrations, and optimization", "parent": "backend"}, False),
+        ({"type": "subtask", "title": "Design schema", "description": "Database design", "parent": "db_task"}, True),
+        ({"type": "subtask", "title": "Create migrations", "description": "Database migrations", "parent": "db_task"}, True),
+        ({"type": "subtask", "title": "Set up connection pooling", "description": "Connection pooling", "parent": "db_task"}, True),
+        ({"type": "subtask", "title": "Add database indexes", "description": "Performance indexes", "parent": "db_task"}, False),
+        ({"type": "subtask", "title": "Performance optimization", "description": "Query optimization", "parent": "db_task"}, False),
         
         # Task 1.2: API Development (with mix of complete/incomplete)
-        api_task_id = create_work_item(
-            project_id, "task", "API Development", 
-            "Build REST API with FastAPI", backend_phase_id
-        )["id"]
-        
-        # Add subtasks (some complete, some not)
-        subtasks = [
-            ("Set up FastAPI framework", True),
-            ("Create user authentication endpoints", True), 
-            ("Implement CRUD operations for users", True),
-            ("Add rate limiting middleware", False),
-            ("Implement API versioning", False),
-            ("Add comprehensive error handling", False),
-            ("Create API documentation", False)
-        ]
-        
-        for title, is_complete in subtasks:
-            subtask_id = create_work_item(
-                project_id, "subtask", title, f"API: {title}", api_task_id
-            )["id"]
-            if is_complete:
-                complete_item(subtask_id, project_id)
-        
-        # Continue with more realistic project structure...
-        # (Similar pattern for frontend, testing phases)
+        ({"key": "api_task", "type": "task", "title": "API Development",
+          "description": "Build REST API with FastAPI", "parent": "backend"}, False),
+        *(({"type": "subtask", "title": title, "description": f"API: {title}", "parent": "api_task"}, is_complete)
+          for title, is_complete in subtasks),
         
         # Phase 2: Frontend Development  
-        frontend_phase_id = create_work_item(
-            project_id, "phase", "Frontend Development",
-            "React-based frontend application", project_item_id
-        )["id"]
-        
-        react_task_id = create_work_item(
-            project_id, "task", "React Setup",
-            "Initialize and configure React application", frontend_phase_id  
-        )["id"]
-        
-        # Add some completed and incomplete React subtasks
-        react_items = [
-            ("Initialize React project", True),
-            ("Set up routing with React Router", True),
-            ("Configure state management (Redux)", True), 
-            ("Set up styling framework (Tailwind)", True),
-            ("Add TypeScript integration", False),
-            ("Set up testing framework (Jest)", False),
-            ("Configure build optimization", False)
-        ]
-        
-        for title, is_complete in react_items:
-            subtask_id = create_work_item(
-                project_id, "subtask", title, f"React: {title}", react_task_id
-            )["id"] 
-            if is_complete:
-                complete_item(subtask_id, project_id)
+        ({"key": "frontend", "type": "phase", "title": "Frontend Development",
+          "description": "React-based frontend application", "parent": "project"}, False),
+        ({"key": "react_task", "type": "task", "title": "React Setup",
+          "description": "Initialize and configure React application", "parent": "frontend"}, False),
+        *(({"type": "subtask", "title": title, "description": f"React: {title}", "parent": "react_task"}, is_complete)
+          for title, is_complete in react_items),
+    ]
+    
+    # Create everything, then complete the finished items, in a single transaction
+    with work_item_txn(project_id) as session:
+        created = session.create_work_items_bulk([spec for spec, _ in items])
+        session.complete_items_bulk([item["id"] for item, (_, is_complete) in zip(created, items) if is_complete])
     
     # Now get the rolling work plan (only incomplete items)
     incomplete_items = get_work_items_for_project(project_id)
@@ -317,7 +281,7 @@ def run_token_comparison():
     # Calculate total tokens for traditional approach
     traditional_total = 0
     for filename, content in traditional_files.items():
-        tokens = estimate_tokens(content)
+        tokens = _TRADITIONAL_FILE_TOKENS[filename]
         traditional_total += tokens
         print(f"  {filename}: {len(content):,} chars → {tokens:,} tokens")
     
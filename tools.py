@@ -12,9 +12,8 @@ from mcp import Tool
 from project_id import get_project_id as _get_project_id
 from database import (
     get_work_items_for_project, 
-    get_all_work_items_for_project,
-    build_hierarchy,
-    add_completion_summaries,
+    get_completion_stats,
+    build_hierarchy_with_summaries,
     create_work_item as _create_work_item,
     update_work_item as _update_work_item,
     complete_item as _complete_item,
@@ -87,14 +86,13 @@ async def get_current_work_plan(arguments: Dict[str, Any]) -> Dict[str, Any]:
         # Get incomplete work items (rolling work plan)
         incomplete_items = get_work_items_for_project(project_id)
         
-        # Get all items for completion summaries
-        all_items = get_all_work_items_for_project(project_id)
+        # Get completed/total child counts for completion summaries
+        completion_stats = get_completion_stats(project_id)
         
-        # Build hierarchy from incomplete items
-        hierarchy = build_hierarchy(incomplete_items)
-        
-        # Add completion summaries using all items
-        hierarchy_with_summaries = add_completion_summaries(hierarchy, all_items)
+        # Build hierarchy from incomplete items, with completion summaries
+        hierarchy_with_summaries = build_hierarchy_with_summaries(
+            incomplete_items, completion_stats=completion_stats
+        )
         
         logger.info(f"Generated work plan for project {project_id}: {len(hierarchy_with_summaries['projects'])} projects, {len(incomplete_items)} incomplete items")
         